@@ -1,38 +1,304 @@
+import os
+import sys
+import json
+import hashlib
+import time
+import warnings
 import numpy as np
-from scipy.stats import gaussian_kde
+from concurrent.futures import ProcessPoolExecutor
+from scipy.stats import gaussian_kde, norm, qmc
+from scipy.signal import fftconvolve
+from scipy.special import i0e, i1e
 import matplotlib.pyplot as plt
 
-def generate_samples(n_samples=1000000):
-    """Generate samples from standard normal distribution"""
-    X = np.random.standard_normal(n_samples)
-    Y = np.random.standard_normal(n_samples)
-    return X, Y
+# Default block size when sampling is spread across worker processes
+PARALLEL_CHUNK_SIZE = 1 << 20
+# Samples drawn in the parent to fix the grid before workers start
+PARALLEL_PILOT_SIZE = 1 << 16
+
+SAMPLERS = ('normal', 'antithetic', 'sobol')
+
+class SampleStream:
+    """
+    Successive blocks of standard normal (X, Y) draws from one stream.
+
+    sampler='normal' draws plain pseudo-random normals, 'antithetic' pairs
+    every draw with its negation, and 'sobol' maps a scrambled Sobol
+    sequence through the inverse normal CDF. X and Y come from separate
+    SeedSequence children and antithetic pairs carry over between blocks,
+    so the draws for a seed do not depend on how they are split into
+    blocks. A sobol stream keeps a single engine, so its blocks are
+    consecutive points of one sequence; start skips ahead so several
+    streams on the same seed can share it. Sobol balance holds at
+    power-of-2 totals, so scipy's warning about other block sizes is
+    silenced here.
+    """
+    def __init__(self, seed=None, sampler='normal', start=0):
+        if sampler not in SAMPLERS:
+            raise ValueError(f"Unknown sampler: {sampler}")
+        self.sampler = sampler
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        if sampler != 'sobol':
+            self.rngs = [np.random.default_rng(child) for child in seed.spawn(2)]
+            self.pending = [None, None]
+        else:
+            # Sobol spawns from its generator's SeedSequence, so scramble from a
+            # copy of the state to keep streams on one seed identical
+            scramble_rng = np.random.default_rng(seed.generate_state(4))
+            self.engine = qmc.Sobol(d=2, scramble=True, seed=scramble_rng)
+            if start:
+                self.engine.fast_forward(start)
+
+    def draw(self, n_samples):
+        """Return the next n_samples (X, Y) pairs"""
+        if self.sampler == 'normal':
+            X, Y = (rng.standard_normal(n_samples) for rng in self.rngs)
+        elif self.sampler == 'antithetic':
+            X, Y = (self._antithetic(i, n_samples) for i in range(2))
+        else:
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', message='The balance properties')
+                u = self.engine.random(n_samples)
+            X, Y = norm.ppf(np.clip(u, 1e-16, 1 - 1e-16)).T
+        return X, Y
+
+    def _antithetic(self, i, n_samples):
+        """Next n_samples of z1, -z1, z2, -z2, ... for coordinate i"""
+        out = np.empty(n_samples)
+        k = 0
+        if self.pending[i] is not None and n_samples > 0:
+            out[0] = self.pending[i]
+            self.pending[i] = None
+            k = 1
+        z = self.rngs[i].standard_normal((n_samples - k + 1) // 2)
+        out[k:] = np.column_stack([z, -z]).ravel()[:n_samples - k]
+        if (n_samples - k) % 2:
+            self.pending[i] = -z[-1]
+        return out
+
+def generate_samples(n_samples=1000000, seed=None, sampler='normal'):
+    """Generate n_samples standard normal (X, Y) pairs, see SampleStream"""
+    return SampleStream(seed, sampler).draw(n_samples)
 
 def compute_condition(X, Y):
     """Compute (X-1)^2 + Y^2"""
     return (X - 1)**2 + Y**2
 
-def estimate_conditional_expectation(n_samples=1000000, n_bins=100):
+def exact_conditional_expectation(z):
+    """
+    Closed form E[X|(X-1)^2 + Y^2 = z] = 1 - sqrt(z) I1(sqrt(z)) / I0(sqrt(z)).
+    Around (1, 0) the angle has density proportional to exp(-sqrt(z) cos(theta)).
+    """
+    r = np.sqrt(z)
+    return 1 - r * i1e(r) / i0e(r)
+
+def scott_bandwidth(values, n_samples=None):
+    """Scott's rule bandwidth for a 1-D sample"""
+    n = len(values) if n_samples is None else n_samples
+    return 1.06 * np.std(values) * n ** (-1 / 5)
+
+def linear_bin(values, weights, lo, delta, n_grid):
+    """
+    Spread values onto a regular grid with linear binning weights.
+    Returns per-bin count, sum and sum of squares of the weights.
+    Values falling outside [lo, lo + (n_grid-1)*delta] are dropped.
+    """
+    pos = (values - lo) / delta
+    left = np.floor(pos).astype(np.int64)
+    inside = (left >= 0) & (left < n_grid - 1)
+    left = left[inside]
+    right_frac = pos[inside] - left
+    left_frac = 1.0 - right_frac
+    weights = weights[inside]
+
+    def spread(w):
+        return (np.bincount(left, w * left_frac, minlength=n_grid)
+                + np.bincount(left + 1, w * right_frac, minlength=n_grid))
+
+    return spread(1.0), spread(weights), spread(weights**2)
+
+def gaussian_smooth(binned, kernel):
+    """Convolve binned values with a kernel via FFT"""
+    return fftconvolve(binned, kernel, mode='same')
+
+class BinnedMoments:
+    """
+    Online per-bin accumulators (count, sum, sum of squares) on a fixed grid.
+    Memory is O(n_grid) however many samples are folded in.
+    """
+    def __init__(self, lo, hi, n_grid):
+        self.lo = lo
+        self.hi = hi
+        self.n_grid = n_grid
+        self.delta = (hi - lo) / (n_grid - 1)
+        self.counts = np.zeros(n_grid)
+        self.sums = np.zeros(n_grid)
+        self.sumsqs = np.zeros(n_grid)
+        # Totals over every sample, including those outside the grid
+        self.n_total = 0
+        self.x_total = 0.0
+
+    @property
+    def grid(self):
+        return self.lo + self.delta * np.arange(self.n_grid)
+
+    def add(self, condition_values, targets):
+        """Fold a block of samples into the accumulators"""
+        counts, sums, sumsqs = linear_bin(condition_values, targets, self.lo, self.delta, self.n_grid)
+        self.counts += counts
+        self.sums += sums
+        self.sumsqs += sumsqs
+        self.n_total += len(targets)
+        self.x_total += np.sum(targets)
+
+    def merge(self, other):
+        """Add another accumulator on the same grid into this one"""
+        self.counts += other.counts
+        self.sums += other.sums
+        self.sumsqs += other.sumsqs
+        self.n_total += other.n_total
+        self.x_total += other.x_total
+        return self
+
+    def smooth(self, bandwidth, control_variate=False):
+        """
+        Nadaraya-Watson mean and standard error at every grid node.
+        Var ~ sum K^2 (X - m)^2 / (sum K)^2, expanded in the binned moments.
+
+        control_variate=True uses the sample mean of X, whose expectation is
+        known to be 0, as a control. The optimal coefficient at each node is
+        the kernel-weighted variance of X there.
+        """
+        half_width = max(1, int(np.ceil(4 * bandwidth / self.delta)))
+        offsets = np.arange(-half_width, half_width + 1) * self.delta
+        kernel = np.exp(-0.5 * (offsets / bandwidth)**2)
+
+        weight = gaussian_smooth(self.counts, kernel)
+        mean = gaussian_smooth(self.sums, kernel) / weight
+
+        if control_variate:
+            local_var = gaussian_smooth(self.sumsqs, kernel) / weight - mean**2
+            mean = mean - local_var * self.x_total / self.n_total
+
+        kernel_sq = kernel**2
+        resid = (gaussian_smooth(self.sumsqs, kernel_sq)
+                 - 2 * mean * gaussian_smooth(self.sums, kernel_sq)
+                 + mean**2 * gaussian_smooth(self.counts, kernel_sq))
+        stderr = np.sqrt(np.maximum(resid, 0)) / weight
+        return mean, stderr
+
+def _pilot_moments(condition_values, targets, n_samples, n_grid, bandwidth):
     """
-    Estimate E[X|(X-1)^2 + Y^2] using kernel density estimation
+    Fix the grid range and bandwidth from a pilot block of samples.
+    Returns accumulators already holding the pilot, plus the plotted range.
+    """
+    lo = np.min(condition_values)
+    hi = np.percentile(condition_values, 95)
+    if bandwidth is None:
+        bandwidth = scott_bandwidth(condition_values, n_samples)
+
+    # Pad the binned range so the kernel sees both tails
+    moments = BinnedMoments(lo - 4 * bandwidth, hi + 4 * bandwidth, n_grid)
+    moments.add(condition_values, targets)
+    return moments, lo, hi, bandwidth
+
+def _moments_to_grid(moments, lo, hi, n_bins, bandwidth, control_variate=False):
+    """Smooth accumulated moments and interpolate onto n_bins output points"""
+    mean, stderr = moments.smooth(bandwidth, control_variate)
+    grid_points = np.linspace(lo, hi, n_bins)
+    return (grid_points,
+            np.interp(grid_points, moments.grid, mean),
+            np.interp(grid_points, moments.grid, stderr))
+
+def _fill_moments(moments, n_samples, chunk_size, stream):
+    """Draw n_samples from stream in blocks of chunk_size and fold them into moments"""
+    drawn = 0
+    while drawn < n_samples:
+        size = min(chunk_size, n_samples - drawn)
+        X, Y = stream.draw(size)
+        moments.add(compute_condition(X, Y), X)
+        drawn += size
+    return moments
+
+def _worker_moments(lo, hi, n_grid, n_samples, chunk_size, seed_seq, sampler, start):
+    """Worker entry point: reduce one stream to BinnedMoments"""
+    moments = BinnedMoments(lo, hi, n_grid)
+    return _fill_moments(moments, n_samples, chunk_size, SampleStream(seed_seq, sampler, start))
+
+def _binned_moments(n_samples, n_grid, bandwidth, chunk_size, seed, n_workers, sampler):
+    """
+    Draw samples and reduce them to BinnedMoments on a linear-binned grid.
+    Samples are drawn chunk_size at a time and folded into the accumulators;
+    the first chunk fixes the grid range and bandwidth.
+
+    With n_workers, a small pilot block of PARALLEL_PILOT_SIZE samples uses
+    SeedSequence child 0 and the rest of the samples are split across
+    workers on children 1..n_workers, drawn chunk_size at a time. Sobol
+    workers instead all use child 0 and skip ahead to their share, so the
+    run covers one Sobol sequence.
+    Partial moments are merged in worker order, so results are
+    bit-reproducible for a given seed and worker count.
+    Returns (moments, lo, hi, bandwidth).
+    """
+    if n_workers is not None:
+        seed_seqs = np.random.SeedSequence(seed).spawn(n_workers + 1)
+        stream = SampleStream(seed_seqs[0], sampler)
+        if chunk_size is None:
+            chunk_size = PARALLEL_CHUNK_SIZE
+        pilot_size = min(PARALLEL_PILOT_SIZE, n_samples)
+    else:
+        stream = SampleStream(seed, sampler)
+        chunk_size = n_samples if chunk_size is None else min(chunk_size, n_samples)
+        pilot_size = chunk_size
+
+    X, Y = stream.draw(pilot_size)
+    moments, lo, hi, bandwidth = _pilot_moments(compute_condition(X, Y), X, n_samples,
+                                                n_grid, bandwidth)
+    del X, Y
+
+    remaining = n_samples - pilot_size
+    if n_workers is None:
+        _fill_moments(moments, remaining, chunk_size, stream)
+    elif remaining > 0:
+        shares = [remaining // n_workers + (i < remaining % n_workers) for i in range(n_workers)]
+        starts = pilot_size + np.cumsum([0] + shares[:-1])
+        if sampler == 'sobol':
+            seed_seqs[1:] = [seed_seqs[0]] * n_workers
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [
+                pool.submit(_worker_moments, moments.lo, moments.hi, n_grid, share, chunk_size,
+                            seed_seq, sampler, int(start))
+                for share, seed_seq, start in zip(shares, seed_seqs[1:], starts)
+            ]
+            for future in futures:
+                moments.merge(future.result())
+
+    return moments, lo, hi, bandwidth
+
+def _binned_conditional_expectation(n_samples, n_bins, n_grid, bandwidth, chunk_size,
+                                    seed, n_workers, sampler, control_variate):
+    """Nadaraya-Watson estimate of E[X|condition] on linear-binned data"""
+    moments, lo, hi, bandwidth = _binned_moments(n_samples, n_grid, bandwidth, chunk_size,
+                                                 seed, n_workers, sampler)
+    return _moments_to_grid(moments, lo, hi, n_bins, bandwidth, control_variate)
+
+def _kde_conditional_expectation(condition_values, X, n_bins):
+    """
+    Reference estimate using a full 2-D gaussian_kde.
+    O(N^2) per grid point - only practical for small samples.
     """
-    # Generate samples
-    X, Y = generate_samples(n_samples)
-    
-    # Compute condition values
-    condition_values = compute_condition(X, Y)
-    
     # Sort everything by condition values
     sorted_indices = np.argsort(condition_values)
     condition_values = condition_values[sorted_indices]
     X = X[sorted_indices]
-    
+
     # Use kernel density estimation
     kernel = gaussian_kde(np.vstack([condition_values, X]))
-    
+
     # Create grid for evaluation
     grid_points = np.linspace(np.min(condition_values), np.percentile(condition_values, 95), n_bins)
-    
+
     # Estimate conditional expectation
     conditional_expectations = []
     for z in grid_points:
@@ -43,9 +309,183 @@ def estimate_conditional_expectation(n_samples=1000000, n_bins=100):
         # Compute conditional expectation
         conditional_expectation = np.sum(X * density) / np.sum(density)
         conditional_expectations.append(conditional_expectation)
-    
+
     return grid_points, conditional_expectations
 
+def estimate_conditional_expectation(n_samples=1000000, n_bins=100, method='binned',
+                                     n_grid=4096, bandwidth=None, chunk_size=None,
+                                     seed=None, n_workers=None, sampler='normal',
+                                     control_variate=False, return_stderr=False):
+    """
+    Estimate E[X|(X-1)^2 + Y^2]
+
+    method='binned' uses a linear-binned, FFT-smoothed Nadaraya-Watson estimator.
+    Passing chunk_size streams the samples in blocks so memory stays constant
+    in n_samples. n_workers spreads sampling over a process pool with
+    independent SeedSequence streams derived from seed. sampler picks the
+    draw scheme (see generate_samples). control_variate corrects the
+    binned estimate with the known E[X]=0, which in practice changes the
+    error very little. method='kde' is the original
+    gaussian_kde estimator, kept for comparison (no standard errors).
+    """
+    if method == 'binned':
+        grid_points, conditional_expectations, std_err = _binned_conditional_expectation(
+            n_samples, n_bins, n_grid, bandwidth, chunk_size, seed, n_workers,
+            sampler, control_variate)
+        if return_stderr:
+            return grid_points, conditional_expectations, std_err
+        return grid_points, conditional_expectations
+
+    if method == 'kde':
+        # Generate samples
+        X, Y = generate_samples(n_samples, seed, sampler)
+
+        # Compute condition values
+        condition_values = compute_condition(X, Y)
+        return _kde_conditional_expectation(condition_values, X, n_bins)
+
+    raise ValueError(f"Unknown method: {method}")
+
+class SampleStore:
+    """
+    Memory-mapped on-disk store of (X, Y) draws keyed by seed, size and sampler.
+    Draws are generated once, chunk by chunk, and reopened read-only afterwards;
+    the contents do not depend on chunk_size.
+    """
+    def __init__(self, directory='fun_normal_samples'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, seed, n_samples, sampler='normal'):
+        return os.path.join(self.directory, f"{sampler}_seed{seed}_n{n_samples}.npy")
+
+    def get(self, seed, n_samples, sampler='normal', chunk_size=PARALLEL_CHUNK_SIZE):
+        """Return a read-only (2, n_samples) memmap, generating it if missing"""
+        if seed is None:
+            # Unseeded draws are not reproducible, so they cannot be keyed
+            raise ValueError("SampleStore needs an explicit seed")
+        path = self.path(seed, n_samples, sampler)
+        if not os.path.exists(path):
+            tmp_path = path + '.tmp'
+            samples = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64,
+                                                shape=(2, n_samples))
+            stream = SampleStream(seed, sampler)
+            for start in range(0, n_samples, chunk_size):
+                stop = min(start + chunk_size, n_samples)
+                samples[0, start:stop], samples[1, start:stop] = stream.draw(stop - start)
+            samples.flush()
+            del samples
+            # Rename so a half-written file is never picked up
+            os.replace(tmp_path, path)
+        return np.load(path, mmap_mode='r')
+
+def evaluate_conditional_expectations(samples, queries, n_bins=100, n_grid=4096,
+                                      bandwidth=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Estimate E[target | condition] for many queries in one sweep over samples.
+
+    samples is a (2, N) array of (X, Y) draws, typically from SampleStore.get.
+    queries maps a name to a (condition_fn, target_fn) pair of vectorised
+    functions of (X, Y). Each block of samples is read once as a view and
+    folded into every query's accumulators, so nothing is regenerated or copied.
+    Returns a dict of name -> (grid_points, conditional_expectations, std_err).
+    """
+    n_samples = samples.shape[1]
+    chunk_size = min(chunk_size, n_samples)
+
+    state = {}
+    X, Y = samples[0, :chunk_size], samples[1, :chunk_size]
+    for name, (condition_fn, target_fn) in queries.items():
+        state[name] = _pilot_moments(condition_fn(X, Y), target_fn(X, Y), n_samples,
+                                     n_grid, bandwidth)
+
+    for start in range(chunk_size, n_samples, chunk_size):
+        X, Y = samples[0, start:start + chunk_size], samples[1, start:start + chunk_size]
+        for name, (condition_fn, target_fn) in queries.items():
+            state[name][0].add(condition_fn(X, Y), target_fn(X, Y))
+
+    return {name: _moments_to_grid(moments, lo, hi, n_bins, h)
+            for name, (moments, lo, hi, h) in state.items()}
+
+class ConditionalExpectationTable:
+    """
+    Cached lookup table of E[X|(X-1)^2 + Y^2] from the binned estimator.
+
+    The table and the BinnedMoments behind it are saved under cache_dir,
+    keyed by a hash of the estimator parameters, so changing any parameter
+    picks a different entry. Asking for more n_bins than are cached
+    re-smooths the stored moments instead of drawing new samples.
+    """
+    def __init__(self, n_bins=100, cache_dir='fun_normal_cache', n_samples=1000000,
+                 n_grid=4096, bandwidth=None, chunk_size=None, seed=0, n_workers=None,
+                 sampler='normal', control_variate=False):
+        self.cache_dir = cache_dir
+        self.params = dict(n_samples=n_samples, n_grid=n_grid, bandwidth=bandwidth,
+                           chunk_size=chunk_size, seed=seed, n_workers=n_workers,
+                           sampler=sampler, control_variate=control_variate)
+        key = hashlib.sha1(json.dumps(self.params, sort_keys=True).encode()).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"table_{key}.npz")
+
+        if not self._load():
+            moments, lo, hi, h = _binned_moments(n_samples, n_grid, bandwidth, chunk_size,
+                                                 seed, n_workers, sampler)
+            self.moments, self.lo, self.hi, self.bandwidth = moments, lo, hi, h
+            self._build(n_bins)
+        elif n_bins > len(self.grid_points):
+            self.refine(n_bins)
+
+    def _load(self):
+        """Load a cached entry whose stored parameters match exactly"""
+        if not os.path.exists(self.path):
+            return False
+        with np.load(self.path) as data:
+            if json.loads(str(data['params'])) != self.params:
+                return False
+            self.lo, self.hi, self.bandwidth = data['range_bandwidth']
+            bin_lo, bin_hi = data['bin_range']
+            self.moments = BinnedMoments(bin_lo, bin_hi, len(data['counts']))
+            self.moments.counts = data['counts']
+            self.moments.sums = data['sums']
+            self.moments.sumsqs = data['sumsqs']
+            self.moments.n_total, self.moments.x_total = int(data['totals'][0]), data['totals'][1]
+            self.grid_points = data['grid_points']
+            self.conditional_expectations = data['conditional_expectations']
+            self.std_err = data['std_err']
+        return True
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp.npz'
+        np.savez(tmp_path,
+                 params=json.dumps(self.params, sort_keys=True),
+                 range_bandwidth=[self.lo, self.hi, self.bandwidth],
+                 bin_range=[self.moments.lo, self.moments.hi],
+                 counts=self.moments.counts, sums=self.moments.sums,
+                 sumsqs=self.moments.sumsqs,
+                 totals=[self.moments.n_total, self.moments.x_total],
+                 grid_points=self.grid_points,
+                 conditional_expectations=self.conditional_expectations,
+                 std_err=self.std_err)
+        os.replace(tmp_path, self.path)
+
+    def _build(self, n_bins):
+        self.grid_points, self.conditional_expectations, self.std_err = _moments_to_grid(
+            self.moments, self.lo, self.hi, n_bins, self.bandwidth,
+            self.params['control_variate'])
+        self._save()
+
+    def refine(self, n_bins):
+        """Re-derive the table on a denser grid from the cached moments"""
+        self._build(n_bins)
+        return self
+
+    def query(self, z, return_stderr=False):
+        """Interpolate the cached table at the condition values z"""
+        values = np.interp(z, self.grid_points, self.conditional_expectations)
+        if return_stderr:
+            return values, np.interp(z, self.grid_points, self.std_err)
+        return values
+
 def plot_results(grid_points, conditional_expectations):
     """Plot the estimated conditional expectation"""
     plt.figure(figsize=(10, 6))
@@ -57,13 +497,64 @@ def plot_results(grid_points, conditional_expectations):
     plt.legend()
     plt.show()
 
-# Run simulation
-grid_points, conditional_expectations = estimate_conditional_expectation()
+def benchmark_samplers(target_sd=0.005, n_bins=100, n_reps=5, min_samples=2**14,
+                       max_samples=2**24, interior_bandwidths=3):
+    """
+    Report wall time for each sampler to reach target_sd against the
+    closed-form answer. Errors are taken only on interior grid points more
+    than interior_bandwidths bandwidths above the lower end of the grid,
+    where the Nadaraya-Watson boundary bias (about -0.09 at z=0, the same
+    for every sampler) does not swamp the sampling noise.
+    n_samples doubles until the spread of the estimates across n_reps seeds
+    (RMS over interior points of the per-point standard deviation) falls
+    below the target; the bias of the seed-averaged curve is reported
+    separately. The control variate row is kept for comparison but barely
+    moves the spread, since E[X]=0 carries little information about E[X|z].
+    """
+    configs = [(sampler, False) for sampler in SAMPLERS] + [('normal', True)]
+    results = []
+    for sampler, control_variate in configs:
+        label = sampler + (' + control variate' if control_variate else '')
+        n_samples = min_samples
+        while True:
+            estimates = []
+            start = time.perf_counter()
+            for rep in range(n_reps):
+                moments, lo, hi, bandwidth = _binned_moments(n_samples, 4096, None, None, rep,
+                                                             None, sampler)
+                grid_points, conditional_expectations, _ = _moments_to_grid(
+                    moments, lo, hi, n_bins, bandwidth, control_variate)
+                estimates.append(conditional_expectations)
+            elapsed = (time.perf_counter() - start) / n_reps
+
+            interior = grid_points > lo + interior_bandwidths * bandwidth
+            estimates = np.array(estimates)[:, interior]
+            sd = np.sqrt(np.mean(estimates.var(axis=0, ddof=1)))
+            bias = np.sqrt(np.mean((estimates.mean(axis=0)
+                                    - exact_conditional_expectation(grid_points[interior]))**2))
+            if sd <= target_sd or n_samples >= max_samples:
+                break
+            n_samples *= 2
+
+        reached = sd <= target_sd
+        results.append((label, n_samples, sd, bias, elapsed, reached))
+        print(f"{label:<28} n={n_samples:>10,}  seed sd={sd:.5f}  interior bias={bias:.5f}  "
+              f"time={elapsed:.3f}s" + ("" if reached else "  (target not reached)"))
+    return results
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_samplers()
+        sys.exit()
+
+    # Run simulation, or reuse the cached table from a previous run
+    table = ConditionalExpectationTable()
+    grid_points, conditional_expectations = table.grid_points, table.conditional_expectations
 
-# Plot results
-plot_results(grid_points, conditional_expectations)
+    # Plot results
+    plot_results(grid_points, conditional_expectations)
 
-# Print some specific values
-print("\nSome specific conditional expectations:")
-for i in range(0, len(grid_points), len(grid_points)//5):
-    print(f"E[X|(X-1)^2 + Y^2 = {grid_points[i]:.2f}] ≈ {conditional_expectations[i]:.4f}")
+    # Print some specific values
+    print("\nSome specific conditional expectations:")
+    for i in range(0, len(grid_points), len(grid_points)//5):
+        print(f"E[X|(X-1)^2 + Y^2 = {grid_points[i]:.2f}] ≈ {conditional_expectations[i]:.4f}")
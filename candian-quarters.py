@@ -8,10 +8,24 @@ import errno
 import ssl
 import certifi
 
+EXCHANGERATE_API_URL = "https://open.er-api.com/v6/latest/{base}"
+
 class ForexRateFetcher:
-    def __init__(self):
+    def __init__(self, base_currency='USD', ttl=300, api_url=EXCHANGERATE_API_URL,
+                 use_forex_python=True, retry_after=30):
         # Configure default timeout
         self.timeout = 30
+
+        # One base table serves every pair by triangulation until it expires
+        self.base_currency = base_currency
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.api_url = api_url
+        self.use_forex_python = use_forex_python
+        self.rates = {}
+        self.rates_fetched_at = None
+        self.retry_at = None
+        self.currency_rates = None
         
         # Configure SSL context with modern security settings
         self.ssl_context = ssl.create_default_context(cafile=certifi.where())
@@ -53,48 +67,74 @@ class ForexRateFetcher:
         
         return session
     
-    def _get_rate_from_forex_python(self, from_currency, to_currency):
-        """Try getting rate from forex-python"""
+    def _get_rates_from_forex_python(self, base_currency):
+        """Try getting every rate against base_currency from forex-python"""
         try:
-            if 'forex_python' not in self.sessions:
+            if self.currency_rates is None:
                 self.sessions['forex_python'] = self._create_session()
-            
-            c = CurrencyRates(force_decimal=False)
-            c.session = self.sessions['forex_python']
-            return c.get_rate(from_currency, to_currency)
+                self.currency_rates = CurrencyRates(force_decimal=False)
+                self.currency_rates.session = self.sessions['forex_python']
+            return self.currency_rates.get_rates(base_currency)
         except Exception as e:
             print(f"Forex-python failed: {str(e)}")
             return None
 
-    def _get_rate_from_exchangerate_api(self, from_currency, to_currency):
-        """Fallback to exchangerate-api.com"""
+    def _get_rates_from_exchangerate_api(self, base_currency):
+        """Fallback to exchangerate-api.com, whose response holds every rate"""
         try:
             if 'exchangerate' not in self.sessions:
                 self.sessions['exchangerate'] = self._create_session()
-                
-            url = f"https://open.er-api.com/v6/latest/{from_currency}"
-            response = self.sessions['exchangerate'].get(url)
+
+            url = self.api_url.format(base=base_currency)
+            response = self.sessions['exchangerate'].get(url, timeout=self.timeout)
             data = response.json()
-            return data['rates'].get(to_currency)
+            return data['rates']
         except Exception as e:
             print(f"Exchangerate-api failed: {str(e)}")
             return None
 
+    def _refresh_rates(self):
+        """Refill the rate table from one base fetch, trying each source in turn"""
+        rates = None
+        if self.use_forex_python:
+            rates = self._get_rates_from_forex_python(self.base_currency)
+        if not rates:
+            rates = self._get_rates_from_exchangerate_api(self.base_currency)
+        if not rates:
+            return False
+
+        self.rates = {currency: float(rate) for currency, rate in rates.items()}
+        self.rates[self.base_currency] = 1.0
+        self.rates_fetched_at = time.monotonic()
+        return True
+
+    def get_rates(self):
+        """
+        Rates against base_currency, refetched once the table is older than ttl.
+        After a failed refresh the next attempt waits retry_after seconds, and
+        the stale table (if any) is served until then.
+        """
+        now = time.monotonic()
+        expired = self.rates_fetched_at is None or now - self.rates_fetched_at > self.ttl
+        if expired and (self.retry_at is None or now >= self.retry_at):
+            if self._refresh_rates():
+                self.retry_at = None
+            else:
+                self.retry_at = time.monotonic() + self.retry_after
+                if self.rates:
+                    print("Using stale forex rates")
+        if not self.rates:
+            raise Exception("Failed to get forex rates from all sources")
+        return self.rates
+
     def get_forex_rate(self, from_currency, to_currency):
-        """Get forex rate with multiple fallback sources"""
-        errors = []
-        
-        # Try primary source (forex-python)
-        rate = self._get_rate_from_forex_python(from_currency, to_currency)
-        if rate is not None:
-            return rate
-            
-        # Try fallback source
-        rate = self._get_rate_from_exchangerate_api(from_currency, to_currency)
-        if rate is not None:
-            return rate
-            
-        raise Exception(f"Failed to get forex rate from all sources")
+        """Get forex rate by triangulating through the cached base table"""
+        rates = self.get_rates()
+        if from_currency == to_currency:
+            return 1.0
+        if from_currency not in rates or to_currency not in rates:
+            raise Exception(f"No rate for {from_currency}/{to_currency}")
+        return rates[to_currency] / rates[from_currency]
 
     def cleanup(self):
         """Clean up all sessions"""
@@ -1,31 +1,658 @@
+import os
+import sys
+import time
+import heapq
+import importlib.util
+from importlib.machinery import PathFinder
 import numpy as np
 import matplotlib.pyplot as plt
-from dtw import *
-
-# Generate sample data
-np.random.seed(42)
-t = np.linspace(0, 2*np.pi, 100)
-x = np.sin(t)  # Reference sequence
-y = np.sin(t + 0.5) + 0.1 * np.random.randn(100)  # Sequence to be aligned
-
-# Perform DTW alignment
-alignment = dtw(x, y, keep_internals=True)
-
-# Create aligned version of y using the warping path
-y_aligned = np.zeros_like(x)
-for idx_x, idx_y in zip(alignment.index1, alignment.index2):
-    y_aligned[idx_x] = y[idx_y]
-
-# Plotting
-plt.figure(figsize=(10, 6))
-plt.plot(t, x, 'b-', label='Reference (x)', linewidth=2)
-plt.plot(t, y, 'r--', label='Original y', alpha=0.5)
-plt.plot(t, y_aligned, 'g-', label='Aligned y', linewidth=2)
-plt.title('DTW Sequence Alignment')
-plt.xlabel('Time')
-plt.ylabel('Amplitude')
-plt.legend()
-plt.grid(True)
-
-# Print alignment quality metric
-print(f"DTW distance: {alignment.distance:.4f}")
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from numba import jit
+
+# Backtracking directions stored per cell
+DIAGONAL, UP, LEFT = 0, 1, 2
+
+@dataclass
+class DTWAlignment:
+    """Result of a DTW alignment, field names follow the dtw package"""
+    distance: float
+    index1: np.ndarray
+    index2: np.ndarray
+    band_lo: Optional[np.ndarray] = None
+    band_hi: Optional[np.ndarray] = None
+    cost_matrix: Optional[np.ndarray] = None
+    approximation_error: Optional[float] = None
+
+def sakoe_chiba_band(n, m, window):
+    """
+    Column range [lo, hi) per row within `window` cells of the diagonal,
+    which is slanted when n != m so the band always reaches (n-1, m-1).
+    Every row is non-empty and meets the next, even for window < 0.5.
+    """
+    centre = np.arange(n) * ((m - 1) / max(n - 1, 1))
+    # Row i always covers floor(centre) to ceil(centre) and reaches the floor
+    # of the next row's centre, so rows are never empty, every row meets the
+    # next, and a wider window always covers a superset of cells
+    reach = np.append(np.floor(centre[1:]), 0)
+    lo = np.minimum(np.ceil(centre - window), np.floor(centre))
+    hi = np.maximum(np.maximum(np.floor(centre + window), np.ceil(centre)) + 1, reach)
+    lo = np.clip(lo, 0, m - 1).astype(np.int64)
+    hi = np.clip(hi, 1, m).astype(np.int64)
+    return _connect_band(lo, hi, m)
+
+def itakura_band(n, m, max_slope=2.0):
+    """Column range [lo, hi) per row inside the Itakura parallelogram"""
+    i = np.arange(n)
+    r = (m - 1) / max(n - 1, 1)
+    tail = (n - 1) - i
+    lower = np.maximum(r * i / max_slope, (m - 1) - max_slope * r * tail)
+    upper = np.minimum(max_slope * r * i, (m - 1) - r * tail / max_slope)
+    diagonal = np.round(r * i)
+    lo = np.clip(np.ceil(np.minimum(lower, diagonal)), 0, m - 1).astype(np.int64)
+    hi = np.clip(np.floor(np.maximum(upper, diagonal)) + 1, 1, m).astype(np.int64)
+    return _connect_band(lo, hi, m)
+
+def _connect_band(lo, hi, m):
+    """Widen rows so the band spans both corners and every row meets the next"""
+    lo[0], hi[-1] = 0, m
+    hi[:-1] = np.maximum(hi[:-1], lo[1:])
+    return lo, hi
+
+def band(n, m, window=None, window_type='sakoechiba'):
+    """Column range [lo, hi) per row of an n x m alignment for the given window"""
+    if window_type == 'itakura':
+        return itakura_band(n, m, 2.0 if window is None else window)
+    if window_type == 'sakoechiba':
+        return sakoe_chiba_band(n, m, max(n, m) if window is None else window)
+    raise ValueError(f"Unknown window type: {window_type}")
+
+@jit(nopython=True)
+def _row_costs(x, y, i, lo, hi, out):
+    """Euclidean local cost of x[i] against every row of y[lo:hi], written into out"""
+    d = x.shape[1]
+    for j in range(lo, hi):
+        total = 0.0
+        for c in range(d):
+            diff = y[j, c] - x[i, c]
+            total += diff * diff
+        out[j - lo] = np.sqrt(total)
+
+@jit(nopython=True)
+def _banded_dtw(x, y, lo, hi, offsets, store_path, store_costs, cutoff):
+    """
+    Symmetric2 DTW (diagonal steps weigh twice) between n x d and m x d
+    series, restricted to a band.
+    Costs live in two rolling rows of the band width; the int8 steps are
+    kept only when a path is wanted, row i at offsets[i] in a flat array so
+    a band with a few wide rows stays cheap, and the full banded cost
+    matrix only when store_costs is set. Returns inf as soon as a whole row
+    exceeds cutoff, or when the final distance does.
+    """
+    n = x.shape[0]
+    width = 0
+    for i in range(n):
+        width = max(width, hi[i] - lo[i])
+
+    steps = np.zeros(offsets[n] if store_path else 1, dtype=np.int8)
+    costs = np.full((n if store_costs else 1, width), np.inf)
+    prev = np.full(width, np.inf)
+    curr = np.full(width, np.inf)
+    local = np.empty(width)
+
+    for i in range(n):
+        _row_costs(x, y, i, lo[i], hi[i], local)
+        row_min = np.inf
+        for j in range(lo[i], hi[i]):
+            k = j - lo[i]
+            c = local[k]
+            if i == 0 and j == 0:
+                best, step = c, DIAGONAL
+            else:
+                best, step = np.inf, DIAGONAL
+                if i > 0 and lo[i - 1] <= j - 1 < hi[i - 1]:
+                    best = prev[j - 1 - lo[i - 1]] + 2 * c
+                if i > 0 and lo[i - 1] <= j < hi[i - 1]:
+                    v = prev[j - lo[i - 1]] + c
+                    if v < best:
+                        best, step = v, UP
+                if j > lo[i]:
+                    v = curr[k - 1] + c
+                    if v < best:
+                        best, step = v, LEFT
+            curr[k] = best
+            row_min = min(row_min, best)
+            if store_path:
+                steps[offsets[i] + k] = step
+            if store_costs:
+                costs[i, k] = best
+
+        # Early abandon: costs never decrease along a path
+        if row_min > cutoff:
+            return np.inf, steps, costs
+
+        # Every cell of a row is written before it is read, so no reset
+        prev, curr = curr, prev
+
+    distance = prev[hi[n - 1] - 1 - lo[n - 1]]
+    if distance > cutoff:
+        return np.inf, steps, costs
+    return distance, steps, costs
+
+@jit(nopython=True)
+def _backtrack(steps, lo, offsets, n, m):
+    """Follow stored steps back from (n-1, m-1), returns index1 and index2"""
+    index1 = np.empty(n + m, dtype=np.int64)
+    index2 = np.empty(n + m, dtype=np.int64)
+    i, j, k = n - 1, m - 1, 0
+    while True:
+        index1[k], index2[k] = i, j
+        k += 1
+        if i == 0 and j == 0:
+            break
+        step = steps[offsets[i] + j - lo[i]]
+        if step == DIAGONAL:
+            i, j = i - 1, j - 1
+        elif step == UP:
+            i -= 1
+        else:
+            j -= 1
+    return index1[:k][::-1].copy(), index2[:k][::-1].copy()
+
+def as_series(x):
+    """View a 1-D sequence or n x d array as a contiguous float64 n x d series"""
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    return x.reshape(len(x), -1)
+
+def derivative(x):
+    """
+    Keogh-Pazzani derivative estimate along time, the average of the left
+    slope and the centred slope; end points copy their neighbour.
+    """
+    x = as_series(x)
+    if len(x) < 3:
+        return np.zeros_like(x)
+    d = np.empty_like(x)
+    d[1:-1] = ((x[1:-1] - x[:-2]) + (x[2:] - x[:-2]) / 2) / 2
+    d[0], d[-1] = d[1], d[-2]
+    return d
+
+def warp(y, alignment, n=None):
+    """
+    Resample y onto the time axis of the first series of alignment. Where
+    several y samples map to one index the last one wins.
+    """
+    y = np.asarray(y)
+    n = alignment.index1[-1] + 1 if n is None else n
+    y_aligned = np.zeros((n,) + y.shape[1:], dtype=y.dtype)
+    y_aligned[alignment.index1] = y[alignment.index2]
+    return y_aligned
+
+def dtw(x, y, window=None, window_type='sakoechiba', keep_internals=False,
+        distance_only=False, cutoff=np.inf, derivative_dtw=False):
+    """
+    Banded dynamic time warping between x and y, each either a 1-D sequence
+    or an n x d multivariate series compared by Euclidean local cost.
+    derivative_dtw aligns the series' derivative estimates instead of
+    their values.
+
+    window limits warping to `window` cells of the diagonal ('sakoechiba'),
+    while window_type='itakura' uses a parallelogram with maximum slope
+    `window` (default 2). Memory is O(n*w) for the path steps, or only two
+    band-width rows with distance_only=True. keep_internals also returns
+    the banded cost matrix. Alignments whose cost exceeds cutoff are
+    abandoned early and come back with distance inf and no path.
+    """
+    x, y = (derivative(x), derivative(y)) if derivative_dtw else (as_series(x), as_series(y))
+    if x.shape[1] != y.shape[1]:
+        raise ValueError(f"Dimension mismatch: {x.shape[1]} vs {y.shape[1]}")
+    n, m = len(x), len(y)
+
+    lo, hi = band(n, m, window, window_type)
+    return _align(x, y, lo, hi, keep_internals, distance_only, cutoff)
+
+def _align(x, y, lo, hi, keep_internals=False, distance_only=False, cutoff=np.inf):
+    """Run the banded kernel on prepared series and package the result"""
+    offsets = np.zeros(len(lo) + 1, dtype=np.int64)
+    np.cumsum(hi - lo, out=offsets[1:])
+    distance, steps, costs = _banded_dtw(x, y, lo, hi, offsets, not distance_only,
+                                         keep_internals, cutoff)
+
+    index1 = index2 = np.empty(0, dtype=np.int64)
+    if not distance_only and np.isfinite(distance):
+        index1, index2 = _backtrack(steps, lo, offsets, len(x), len(y))
+
+    return DTWAlignment(
+        distance=distance,
+        index1=index1,
+        index2=index2,
+        band_lo=lo if keep_internals else None,
+        band_hi=hi if keep_internals else None,
+        cost_matrix=costs if keep_internals else None
+    )
+
+@jit(nopython=True)
+def _band_envelope(y, lo, hi):
+    """
+    Min and max of y[lo[i]:hi[i]] for every row i. Both band edges only move
+    right, so monotonic deques give every row in amortised O(1).
+    """
+    n = lo.shape[0]
+    lower = np.empty(n)
+    upper = np.empty(n)
+    min_q = np.empty(y.shape[0], dtype=np.int64)
+    max_q = np.empty(y.shape[0], dtype=np.int64)
+    min_head = min_tail = max_head = max_tail = 0
+    j = 0
+    for i in range(n):
+        while j < hi[i]:
+            while min_tail > min_head and y[min_q[min_tail - 1]] >= y[j]:
+                min_tail -= 1
+            min_q[min_tail] = j
+            min_tail += 1
+            while max_tail > max_head and y[max_q[max_tail - 1]] <= y[j]:
+                max_tail -= 1
+            max_q[max_tail] = j
+            max_tail += 1
+            j += 1
+        while min_q[min_head] < lo[i]:
+            min_head += 1
+        while max_q[max_head] < lo[i]:
+            max_head += 1
+        lower[i] = y[min_q[min_head]]
+        upper[i] = y[max_q[max_head]]
+    return lower, upper
+
+def _search_chunk(query, references, window, window_type, cutoff):
+    """Worker entry point: exact DTW distances for a slice of candidates"""
+    return [
+        dtw(query, reference, window, window_type, distance_only=True, cutoff=cutoff).distance
+        for reference in references
+    ]
+
+@dataclass
+class DTWSearchResult:
+    """Top-k matches of a search, nearest first"""
+    indices: np.ndarray
+    distances: np.ndarray
+    n_pruned: int
+
+class DTWIndex:
+    """
+    Library of reference series (1-D or n x d) for one-vs-many DTW search.
+
+    Every reference gets a per-dimension LB_Keogh envelope per query
+    length, built once and reused; a multivariate query row is bounded by
+    its distance to the envelope box. A search ranks references by max(LB_Kim, LB_Keogh), both
+    lower bounds of the symmetric2 distance, and runs exact DTW in that
+    order only while a bound can still beat the current k-th best, which
+    is also passed down as the early-abandon cutoff.
+    """
+    def __init__(self, references, window=None, window_type='sakoechiba', derivative_dtw=False):
+        self.derivative_dtw = derivative_dtw
+        self.references = [self._series(r) for r in references]
+        self.window = window
+        self.window_type = window_type
+        self.firsts = np.array([r[0] for r in self.references])
+        self.lasts = np.array([r[-1] for r in self.references])
+        self._envelopes = {}
+
+    def __len__(self):
+        return len(self.references)
+
+    def _series(self, x):
+        return derivative(x) if self.derivative_dtw else as_series(x)
+
+    def envelopes(self, n):
+        """Stacked (lower, upper) envelopes of shape (len(self), n, d) for queries of length n"""
+        if n not in self._envelopes:
+            lower = np.empty((len(self), n, self.firsts.shape[1]))
+            upper = np.empty_like(lower)
+            for r, reference in enumerate(self.references):
+                lo, hi = band(n, len(reference), self.window, self.window_type)
+                for c in range(reference.shape[1]):
+                    lower[r, :, c], upper[r, :, c] = _band_envelope(reference[:, c].copy(), lo, hi)
+            self._envelopes[n] = lower, upper
+        return self._envelopes[n]
+
+    def lower_bounds(self, query):
+        """max(LB_Kim, LB_Keogh) of every reference against query"""
+        query = self._series(query)
+        # LB_Kim: the path always contains both corner cells
+        lb_kim = np.linalg.norm(query[0] - self.firsts, axis=1)
+        if len(query) > 1:
+            lb_kim += np.linalg.norm(query[-1] - self.lasts, axis=1)
+        # LB_Keogh: every query row is visited at least once inside its band
+        lower, upper = self.envelopes(len(query))
+        excess = np.maximum(query - upper, 0) + np.maximum(lower - query, 0)
+        lb_keogh = np.sqrt((excess * excess).sum(axis=2)).sum(axis=1)
+        return np.maximum(lb_kim, lb_keogh)
+
+    def search(self, query, k=1, executor: Optional[ProcessPoolExecutor] = None,
+               batch_size=None) -> DTWSearchResult:
+        """
+        k nearest references to query by DTW distance. With an executor,
+        candidates are evaluated batch_size at a time (default 8 per worker)
+        across its processes, tightening the cutoff between batches.
+        """
+        bounds = self.lower_bounds(query)
+        query = self._series(query)
+        order = np.argsort(bounds, kind='stable')
+        if batch_size is None:
+            batch_size = 1 if executor is None else 8 * (os.cpu_count() or 1)
+
+        best = []  # max-heap of (-distance, index) holding the current top k
+        n_exact = 0
+        for start in range(0, len(order), batch_size):
+            kth = -best[0][0] if len(best) == k else np.inf
+            batch = order[start:start + batch_size]
+            batch = batch[bounds[batch] < kth]
+            if not len(batch):
+                break
+            n_exact += len(batch)
+
+            if executor is None:
+                distances = _search_chunk(query, [self.references[i] for i in batch],
+                                          self.window, self.window_type, kth)
+            else:
+                futures = [
+                    executor.submit(_search_chunk, query, [self.references[i] for i in chunk],
+                                    self.window, self.window_type, kth)
+                    for chunk in np.array_split(batch, os.cpu_count() or 1) if len(chunk)
+                ]
+                distances = [d for future in futures for d in future.result()]
+
+            for i, distance in zip(batch, distances):
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, i))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, i))
+
+        best = sorted((-d, i) for d, i in best)
+        return DTWSearchResult(
+            indices=np.array([i for _, i in best], dtype=np.int64),
+            distances=np.array([d for d, _ in best]),
+            n_pruned=len(self) - n_exact
+        )
+
+@dataclass
+class SubsequenceMatch:
+    """A stream span [start, end] (inclusive sample times) matching a pattern"""
+    pattern: int
+    start: int
+    end: int
+    distance: float
+
+@jit(nopython=True)
+def _spring_kernel(xs, t0, pattern, costs, starts, best, best_span, threshold):
+    """
+    SPRING subsequence DTW over a batch of samples for one pattern.
+    costs/starts hold the column of symmetric2 costs and start times for
+    the latest sample and are updated in place, as are the pending best
+    match (best, best_span). Returns the distances, starts and ends of the
+    matches reported during the batch.
+    """
+    m, d = pattern.shape
+    out_dist = np.empty(xs.shape[0])
+    out_span = np.empty((xs.shape[0], 2), dtype=np.int64)
+    n_out = 0
+    new_costs = np.empty(m)
+    new_starts = np.empty(m, dtype=np.int64)
+
+    for k in range(xs.shape[0]):
+        t = t0 + k
+        for i in range(m):
+            total = 0.0
+            for c in range(d):
+                diff = xs[k, c] - pattern[i, c]
+                total += diff * diff
+            c = np.sqrt(total)
+
+            # A match may start at any sample, so row 0 never carries cost over
+            if i == 0:
+                value, start = c, t
+            else:
+                value, start = costs[i - 1] + 2 * c, starts[i - 1]
+                if new_costs[i - 1] + c < value:
+                    value, start = new_costs[i - 1] + c, new_starts[i - 1]
+                if costs[i] + c < value:
+                    value, start = costs[i] + c, starts[i]
+            new_costs[i] = value
+            new_starts[i] = start
+
+        # Report the pending match once no overlapping path can still beat it
+        if best[0] <= threshold:
+            final = True
+            for i in range(m):
+                if new_costs[i] < best[0] and new_starts[i] <= best_span[1]:
+                    final = False
+                    break
+            if final:
+                out_dist[n_out] = best[0]
+                out_span[n_out] = best_span
+                n_out += 1
+                best[0] = np.inf
+                for i in range(m):
+                    if new_starts[i] <= best_span[1]:
+                        new_costs[i] = np.inf
+
+        if new_costs[m - 1] <= threshold and new_costs[m - 1] < best[0]:
+            best[0] = new_costs[m - 1]
+            best_span[0] = new_starts[m - 1]
+            best_span[1] = t
+
+        costs[:] = new_costs
+        starts[:] = new_starts
+
+    return out_dist[:n_out], out_span[:n_out]
+
+class StreamingMatcher:
+    """
+    Online subsequence DTW of a live series against reference patterns.
+
+    Each pattern keeps one column of costs and start times, so a sample
+    costs O(m) time and the matcher O(m) memory per pattern. Spans whose
+    distance to a pattern is at most its threshold are reported as soon as
+    no overlapping span can match better, without overlaps within a pattern.
+    """
+    def __init__(self, patterns, threshold):
+        self.patterns = [as_series(p) for p in patterns]
+        self.thresholds = np.broadcast_to(np.asarray(threshold, dtype=np.float64),
+                                          (len(self.patterns),)).copy()
+        self.t = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the stream seen so far, keeping the sample clock"""
+        self.costs = [np.full(len(p), np.inf) for p in self.patterns]
+        self.starts = [np.zeros(len(p), dtype=np.int64) for p in self.patterns]
+        self.best = [np.array([np.inf]) for _ in self.patterns]
+        self.best_spans = [np.zeros(2, dtype=np.int64) for _ in self.patterns]
+
+    def update_batch(self, xs):
+        """Consume a batch of samples (k, or k x d) and return the matches it completes"""
+        xs = as_series(xs)
+        matches = []
+        for p, pattern in enumerate(self.patterns):
+            distances, spans = _spring_kernel(xs, self.t, pattern, self.costs[p], self.starts[p],
+                                              self.best[p], self.best_spans[p], self.thresholds[p])
+            matches.extend(SubsequenceMatch(p, int(start), int(end), float(distance))
+                           for distance, (start, end) in zip(distances, spans))
+        self.t += len(xs)
+        return sorted(matches, key=lambda match: (match.end, match.pattern))
+
+    def update(self, x):
+        """Consume a single sample (scalar or length-d vector)"""
+        return self.update_batch(np.asarray(x, dtype=np.float64).reshape(1, -1))
+
+    def flush(self):
+        """Report pending matches that later samples could still have improved"""
+        matches = []
+        for p, best in enumerate(self.best):
+            if best[0] <= self.thresholds[p]:
+                start, end = self.best_spans[p]
+                matches.append(SubsequenceMatch(p, int(start), int(end), float(best[0])))
+                best[0] = np.inf
+        return matches
+
+def _coarsen(x):
+    """Halve the resolution of a series by averaging neighbouring pairs"""
+    half = len(x) // 2
+    coarse = x[:2 * half].reshape(half, 2, -1).mean(axis=1)
+    if len(x) % 2:
+        coarse = np.vstack([coarse, x[-1:]])
+    return coarse
+
+def _project_band(index1, index2, n, m, radius):
+    """
+    Band at double resolution around a coarse warping path: every coarse
+    cell covers a 2 x 2 block, widened by radius cells in both directions.
+    """
+    lo = np.full(n, m, dtype=np.int64)
+    hi = np.zeros(n, dtype=np.int64)
+    for di in (0, 1):
+        rows = np.minimum(2 * index1 + di, n - 1)
+        np.minimum.at(lo, rows, 2 * index2)
+        np.maximum.at(hi, rows, np.minimum(2 * index2 + 2, m))
+
+    # Sliding min/max over neighbouring rows stretches the band vertically
+    wide_lo, wide_hi = lo.copy(), hi.copy()
+    for shift in range(1, radius + 1):
+        np.minimum(wide_lo[shift:], lo[:-shift], out=wide_lo[shift:])
+        np.minimum(wide_lo[:-shift], lo[shift:], out=wide_lo[:-shift])
+        np.maximum(wide_hi[shift:], hi[:-shift], out=wide_hi[shift:])
+        np.maximum(wide_hi[:-shift], hi[shift:], out=wide_hi[:-shift])
+    lo = np.clip(wide_lo - radius, 0, m - 1)
+    hi = np.clip(wide_hi + radius, 1, m)
+    return _connect_band(lo, hi, m)
+
+def fast_dtw(x, y, radius=10, keep_internals=False, distance_only=False,
+             derivative_dtw=False, error_samples=0, sample_length=256, seed=None):
+    """
+    Approximate DTW by the multiscale FastDTW scheme: halve both series
+    until they are short, align them exactly, then at each finer level
+    align only inside the projected path widened by radius. Time and
+    memory are O((n + m) * radius); the distance is that of a real path,
+    so it never undercuts exact DTW.
+
+    With error_samples > 0 the relative error against exact DTW is
+    measured on that many random segment pairs of sample_length samples
+    and returned as approximation_error.
+    """
+    x, y = (derivative(x), derivative(y)) if derivative_dtw else (as_series(x), as_series(y))
+    if x.shape[1] != y.shape[1]:
+        raise ValueError(f"Dimension mismatch: {x.shape[1]} vs {y.shape[1]}")
+
+    levels = [(x, y)]
+    while min(len(levels[-1][0]), len(levels[-1][1])) > 2 * (radius + 2):
+        levels.append((_coarsen(levels[-1][0]), _coarsen(levels[-1][1])))
+
+    coarse_x, coarse_y = levels.pop()
+    lo, hi = sakoe_chiba_band(len(coarse_x), len(coarse_y), max(len(coarse_x), len(coarse_y)))
+    alignment = _align(coarse_x, coarse_y, lo, hi,
+                       keep_internals and not levels, distance_only and not levels)
+    while levels:
+        fine_x, fine_y = levels.pop()
+        lo, hi = _project_band(alignment.index1, alignment.index2, len(fine_x), len(fine_y), radius)
+        alignment = _align(fine_x, fine_y, lo, hi,
+                           keep_internals and not levels, distance_only and not levels)
+
+    if error_samples:
+        alignment.approximation_error = _approximation_error(x, y, radius, error_samples,
+                                                             sample_length, seed)
+    return alignment
+
+def _approximation_error(x, y, radius, n_samples, sample_length, seed):
+    """Mean relative excess of fast_dtw over exact DTW on random segment pairs"""
+    rng = np.random.default_rng(seed)
+    n, m = len(x), len(y)
+    length = min(sample_length, n, m)
+    errors = []
+    for a in rng.integers(0, n - length + 1, n_samples):
+        # Take the y segment at the same relative position
+        b = int(round(a * (m - length) / max(n - length, 1)))
+        seg_x, seg_y = x[a:a + length], y[b:b + length]
+        exact = dtw(seg_x, seg_y, distance_only=True).distance
+        approx = fast_dtw(seg_x, seg_y, radius, distance_only=True).distance
+        errors.append((approx - exact) / exact if exact > 0 else 0.0)
+    return float(np.mean(errors))
+
+def _load_dtw_package():
+    """
+    Import the dtw-python package even though this file shadows it as
+    `dtw` whenever its directory is on sys.path.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    search_path = [p for p in sys.path if os.path.abspath(p or '.') != here]
+    spec = PathFinder.find_spec('dtw', search_path)
+    if spec is None:
+        return None
+    # The package imports its own submodules as dtw.*, so it has to sit
+    # under that name while it loads
+    module = importlib.util.module_from_spec(spec)
+    ours = sys.modules.get('dtw')
+    sys.modules['dtw'] = module
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if ours is None:
+            del sys.modules['dtw']
+        else:
+            sys.modules['dtw'] = ours
+    return module
+
+def benchmark_dtw_package(lengths=(100, 300, 1000), dims=(1, 3), n_reps=3, seed=0):
+    """Time full-window alignments here and in the dtw package on random walks"""
+    package = _load_dtw_package()
+    if package is None:
+        print("dtw-python is not installed, nothing to compare against")
+        return
+    rng = np.random.default_rng(seed)
+    dtw(rng.standard_normal(8), rng.standard_normal(8))  # compile
+
+    print(f"{'n':>6} {'d':>3} {'package s':>10} {'numba s':>10} {'speedup':>8} {'max |diff|':>11}")
+    for n in lengths:
+        for d in dims:
+            x = np.cumsum(rng.standard_normal((n, d)), axis=0)
+            y = np.cumsum(rng.standard_normal((n, d)), axis=0)
+            timings, distances = [], []
+            for align in (package.dtw, dtw):
+                start = time.perf_counter()
+                for _ in range(n_reps):
+                    distance = align(x, y).distance
+                timings.append((time.perf_counter() - start) / n_reps)
+                distances.append(distance)
+            print(f"{n:>6} {d:>3} {timings[0]:>10.4f} {timings[1]:>10.4f} "
+                  f"{timings[0] / timings[1]:>7.1f}x {abs(distances[0] - distances[1]):>11.2e}")
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_dtw_package()
+        sys.exit()
+
+    # Generate sample data
+    np.random.seed(42)
+    t = np.linspace(0, 2*np.pi, 100)
+    x = np.sin(t)  # Reference sequence
+    y = np.sin(t + 0.5) + 0.1 * np.random.randn(100)  # Sequence to be aligned
+
+    # Perform DTW alignment
+    alignment = dtw(x, y, keep_internals=True)
+
+    # Create aligned version of y using the warping path
+    y_aligned = warp(y, alignment, len(x))
+
+    # Plotting
+    plt.figure(figsize=(10, 6))
+    plt.plot(t, x, 'b-', label='Reference (x)', linewidth=2)
+    plt.plot(t, y, 'r--', label='Original y', alpha=0.5)
+    plt.plot(t, y_aligned, 'g-', label='Aligned y', linewidth=2)
+    plt.title('DTW Sequence Alignment')
+    plt.xlabel('Time')
+    plt.ylabel('Amplitude')
+    plt.legend()
+    plt.grid(True)
+
+    # Print alignment quality metric
+    print(f"DTW distance: {alignment.distance:.4f}")
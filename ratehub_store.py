@@ -0,0 +1,353 @@
+"""
+Vote storage for RateHub (today.py).
+Every vote is appended to a SQLite database in WAL mode, so concurrent
+sessions never rewrite each other's data. Closed days are compacted into
+per-day totals in the background. Readers keep running totals and fetch
+only votes they have not seen yet.
+"""
+import os
+import bisect
+import pickle
+import sqlite3
+import datetime
+import warnings
+import threading
+import pandas as pd
+from typing import Dict, List, Optional
+
+STORAGE_COLUMNS = ['BML', 'J', 'VB']
+DB_FILE = 'ratings.db'
+LEGACY_FILE = 'ratings.pkl'
+PERIODS = ('day', 'week', 'month')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS votes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    BML INTEGER NOT NULL,
+    J INTEGER NOT NULL,
+    VB INTEGER NOT NULL,
+    created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS votes_date ON votes (date);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    date TEXT PRIMARY KEY,
+    n_votes INTEGER NOT NULL,
+    BML INTEGER NOT NULL,
+    J INTEGER NOT NULL,
+    VB INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+def rating(total: float, n_votes: int) -> int:
+    """Average vote rounded onto the 0 (green) to 2 (red) scale"""
+    if not n_votes:
+        return 0
+    return min(2, max(0, round(total / n_votes)))
+
+def period_key(date: str, period: str) -> str:
+    """Bucket a YYYY-MM-DD date: itself, its week's Monday, or YYYY-MM"""
+    if period == 'day':
+        return date
+    if period == 'week':
+        day = datetime.date.fromisoformat(date)
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    if period == 'month':
+        return date[:7]
+    raise ValueError(f"Unknown period: {period}")
+
+class VoteAggregator:
+    """
+    Thread-safe running vote count and per-person sums for every day, week
+    and month, so the current rating of any period is a dictionary lookup.
+    Each period also keeps its keys sorted, so a window of the history
+    touches only the rows it returns.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals, self._keys = self._empty()
+
+    @staticmethod
+    def _empty():
+        return {period: {} for period in PERIODS}, {period: [] for period in PERIODS}
+
+    @staticmethod
+    def _fold(totals, keys, rows) -> None:
+        for date, n_votes, *sums in rows:
+            for period in PERIODS:
+                key = period_key(date, period)
+                bucket = totals[period].get(key)
+                if bucket is None:
+                    bucket = totals[period][key] = [0] * (len(STORAGE_COLUMNS) + 1)
+                    bisect.insort(keys[period], key)
+                bucket[0] += n_votes
+                for k, value in enumerate(sums, 1):
+                    bucket[k] += value
+
+    def add(self, rows) -> None:
+        """Fold in (date, n_votes, *per-person sums) rows"""
+        with self._lock:
+            self._fold(self._totals, self._keys, rows)
+
+    def reset(self, rows) -> None:
+        """Replace all totals with rows, readers never see a partial state"""
+        totals, keys = self._empty()
+        self._fold(totals, keys, rows)
+        with self._lock:
+            self._totals, self._keys = totals, keys
+
+    def n_votes(self, date: str, period: str = 'day') -> int:
+        with self._lock:
+            totals = self._totals[period].get(period_key(date, period))
+            return totals[0] if totals else 0
+
+    def ratings(self, date: str, period: str = 'day') -> Dict[str, int]:
+        """Current rating per person for the period holding date, 0 when nobody has voted"""
+        with self._lock:
+            totals = list(self._totals[period].get(period_key(date, period),
+                                                   [0] * (len(STORAGE_COLUMNS) + 1)))
+        return {person: rating(total, totals[0])
+                for person, total in zip(STORAGE_COLUMNS, totals[1:])}
+
+    def dates(self, period: str = 'day') -> List[str]:
+        with self._lock:
+            return list(self._keys[period])
+
+    def count(self, period: str = 'day') -> int:
+        """Number of periods with votes"""
+        return len(self._keys[period])
+
+    def window(self, period: str = 'day', start: Optional[str] = None, end: Optional[str] = None,
+               last: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """
+        Ratings for the periods between start and end (inclusive dates),
+        optionally only the `last` of them, skipping the `offset` newest.
+        Rows are oldest first and indexed by Date (the period's key).
+        """
+        with self._lock:
+            keys = self._keys[period]
+            lo = bisect.bisect_left(keys, period_key(start, period)) if start else 0
+            hi = bisect.bisect_right(keys, period_key(end, period)) if end else len(keys)
+            hi = max(lo, hi - offset)
+            if last is not None:
+                lo = max(lo, hi - last)
+            keys = keys[lo:hi]
+            rows = [self._totals[period][key] for key in keys]
+            data = [[rating(total, row[0]) for total in row[1:]] for row in rows]
+        return pd.DataFrame(data, index=pd.Index(keys, name='Date'), columns=STORAGE_COLUMNS,
+                            dtype='int64')
+
+    def page(self, page: int, page_size: int = 20, period: str = 'day') -> pd.DataFrame:
+        """Page `page` (from 0) of the history, newest first"""
+        return self.window(period, last=page_size, offset=page * page_size).iloc[::-1]
+
+class VoteStore:
+    """
+    Append-only vote log with per-day totals.
+
+    add_vote appends a single row. refresh() reads the votes added since the
+    last call into the aggregator, falling back to a full reload whenever a
+    compaction has run since the last one, as it may have folded votes this
+    reader never saw. Legacy days migrated from ratings.pkl count as a
+    single vote carrying that day's rating.
+    """
+    def __init__(self, path: str = DB_FILE, legacy_path: Optional[str] = LEGACY_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # FULL syncs the WAL on every commit, so an acknowledged vote survives power loss
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.executescript(SCHEMA)
+        self.aggregator = VoteAggregator()
+        self._last_id = 0
+        self._generation = None
+        self._data_version = None
+        self.version = 0
+        self._compactor = None
+        self._stop_event = threading.Event()
+        if legacy_path and os.path.exists(legacy_path):
+            self.migrate_pickle(legacy_path)
+
+    def close(self) -> None:
+        self.stop_compaction()
+        with self._lock:
+            self._conn.close()
+
+    def _meta(self, key: str) -> int:
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+    def migrate_pickle(self, legacy_path: str = LEGACY_FILE) -> int:
+        """
+        One-time import of the old pickled ratings frame into daily_totals.
+        The pickle is renamed afterwards so it is never imported twice; an
+        unreadable one is set aside as .bad with a warning and nothing imported.
+        Returns the number of days imported.
+        """
+        try:
+            with open(legacy_path, 'rb') as f:
+                data = pickle.load(f)
+            rows = []
+            if isinstance(data, pd.DataFrame) and not data.empty:
+                if 'Date' in data.columns:
+                    data = data.set_index('Date')
+                for date, values in data[STORAGE_COLUMNS].dropna().iterrows():
+                    rows.append((pd.Timestamp(date).strftime('%Y-%m-%d'), 1,
+                                 *(int(v) for v in values)))
+        except FileNotFoundError:
+            return 0  # Another process migrated it first
+        except Exception as e:
+            warnings.warn(f"Skipping unreadable {legacy_path}: {e!r}")
+            try:
+                os.replace(legacy_path, legacy_path + '.bad')
+            except FileNotFoundError:
+                pass
+            return 0
+
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO daily_totals (date, n_votes, BML, J, VB) '
+                'VALUES (?, ?, ?, ?, ?)', rows)
+            self._conn.execute('COMMIT')
+        try:
+            os.replace(legacy_path, legacy_path + '.migrated')
+        except FileNotFoundError:
+            pass  # Another process migrated it first; INSERT OR IGNORE kept this harmless
+        return len(rows)
+
+    def add_vote(self, date: str, vote: Dict[str, int]) -> int:
+        """
+        Durably append one vote for date and fold it, with anything other
+        writers added meanwhile, into the aggregator. Returns its id.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO votes (date, BML, J, VB) VALUES (?, ?, ?, ?)',
+                (date, *(int(vote[person]) for person in STORAGE_COLUMNS)))
+            self.refresh()
+            return cursor.lastrowid
+
+    def n_votes(self, date: str) -> int:
+        return self.aggregator.n_votes(date)
+
+    def ratings(self, date: str) -> Dict[str, int]:
+        return self.aggregator.ratings(date)
+
+    def refresh(self) -> List[str]:
+        """Fold in votes added since the last refresh, returns the dates that changed"""
+        with self._lock:
+            changed = set()
+            # One read transaction so a concurrent compaction is seen whole or not at all
+            self._conn.execute('BEGIN')
+            try:
+                generation = self._meta('compactions')
+                if generation != self._generation:
+                    # First load, or a compaction may have folded votes we never saw
+                    daily = self._conn.execute(
+                        'SELECT date, n_votes, BML, J, VB FROM daily_totals').fetchall()
+                    changed.update(self.aggregator.dates())
+                    self._last_id, self._generation = 0, generation
+                    self.aggregator.reset(daily)
+                    changed.update(row[0] for row in daily)
+
+                rows = self._conn.execute(
+                    'SELECT id, date, BML, J, VB FROM votes WHERE id > ? ORDER BY id',
+                    (self._last_id,)).fetchall()
+            finally:
+                self._conn.execute('COMMIT')
+            if rows:
+                self._last_id = rows[-1][0]
+                self.aggregator.add((date, 1, *values) for _, date, *values in rows)
+                changed.update(row[1] for row in rows)
+            if changed:
+                self.version += 1
+        return sorted(changed)
+
+    def poll(self) -> int:
+        """
+        Current version, bumped whenever refresh() changes anything. Votes
+        from this store refresh on write; other connections' commits are
+        noticed through PRAGMA data_version, so an idle poll runs no query
+        against the tables.
+        """
+        with self._lock:
+            data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self.refresh()
+            return self.version
+
+    def history(self, period: str = 'day') -> pd.DataFrame:
+        """Full rating history indexed by Date, oldest first"""
+        self.refresh()
+        return self.aggregator.window(period)
+
+    def window(self, period: str = 'day', **kwargs) -> pd.DataFrame:
+        """Refresh, then VoteAggregator.window"""
+        self.refresh()
+        return self.aggregator.window(period, **kwargs)
+
+    def page(self, page: int, page_size: int = 20, period: str = 'day') -> pd.DataFrame:
+        """Refresh, then VoteAggregator.page"""
+        self.refresh()
+        return self.aggregator.page(page, page_size, period)
+
+    def compact(self, before: str) -> int:
+        """
+        Fold raw votes dated before `before` (YYYY-MM-DD) into daily_totals
+        and delete them in one transaction. Returns the number of votes folded.
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                last_id = self._conn.execute(
+                    'SELECT MAX(id) FROM votes WHERE date < ?', (before,)).fetchone()[0]
+                if last_id is None:
+                    self._conn.execute('COMMIT')
+                    return 0
+                self._conn.execute("""
+                    INSERT INTO daily_totals (date, n_votes, BML, J, VB)
+                    SELECT date, COUNT(*), SUM(BML), SUM(J), SUM(VB) FROM votes
+                    WHERE date < ? AND id <= ? GROUP BY date
+                    ON CONFLICT (date) DO UPDATE SET
+                        n_votes = n_votes + excluded.n_votes,
+                        BML = BML + excluded.BML,
+                        J = J + excluded.J,
+                        VB = VB + excluded.VB
+                """, (before, last_id))
+                n_folded = self._conn.execute(
+                    'DELETE FROM votes WHERE date < ? AND id <= ?', (before, last_id)).rowcount
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('compactions', 1) "
+                    "ON CONFLICT (key) DO UPDATE SET value = value + 1")
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+            return n_folded
+
+    def start_compaction(self, interval: float = 3600.0) -> None:
+        """Compact every closed day from a daemon thread every `interval` seconds"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.wait(interval):
+                self.compact(pd.Timestamp.now().strftime('%Y-%m-%d'))
+
+        self._compactor = threading.Thread(target=run, daemon=True, name='ratehub-compactor')
+        self._compactor.start()
+
+    def stop_compaction(self) -> None:
+        self._stop_event.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
@@ -2,11 +2,20 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 from dataclasses import dataclass
-from numba import jit, float64
+from numba import jit
 import time
-from typing import Optional, Tuple, List
+import asyncio
+import threading
+from typing import Optional, Tuple
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from sr_detectors import DETECTOR_KINDS, KernelDetector, build_detector
+from sr_calibration import CalibrationCache
+from sr_sources import (ObservationSource, SimulatedSource, FileTailSource, ReplaySource,
+                        TCPSource, UDPSource, IngestPipeline)
+
+# Ticks of history kept by the detector, independent of the display window
+HISTORY_CAPACITY = 10000
 
 # Initialize default session state
 def init_session_state():
@@ -16,6 +25,7 @@ def init_session_state():
         'mu1': 2.0,
         'sigma': 1.0,
         'threshold': 100.0,
+        'detector_kind': 'Shiryaev-Roberts',
         
         # Prior Parameters
         'alpha': 0.1,
@@ -24,12 +34,19 @@ def init_session_state():
         
         # Simulation Parameters
         'change_point': 100,
+        'target_arl': 1000.0,
         'update_interval': 0.1,
+        'tick_rate': 1000,
+        'source': 'Simulated',
+        'source_path': 'observations.txt',
+        'source_port': 9999,
         'running': False,
         
         # Display Parameters
         'window_size': 200,
-        'plot_height': 800
+        'plot_height': 800,
+        'max_points': 1000,
+        'downsample': 'lttb'
     }
     
     for key, val in defaults.items():
@@ -46,115 +63,404 @@ class SRParameters:
     mu1: float
     sigma: float
 
-@jit(float64(float64, float64, float64, float64), nopython=True)
-def likelihood_ratio(x: float, mu0: float, mu1: float, sigma: float) -> float:
-    """Compute likelihood ratio for normal distributions"""
-    return np.exp((-(x - mu1)**2 + (x - mu0)**2) / (2 * sigma**2))
-
-class ShiryaevRobertsDetector:
-    def __init__(self, params: SRParameters, threshold: float):
-        self.params = params
-        self.threshold = threshold
+class RingBuffer:
+    """
+    Preallocated circular buffer with zero-copy ordered views.
+    Every value is written twice (at i and i + capacity), so the most recent
+    values are always one contiguous slice of the backing array.
+    """
+    def __init__(self, capacity: int, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._end = 0
+        self._size = 0
         
-        # Initialize statistics
-        self.R = 0.0
-        self.observations: List[float] = []
-        self.Rs: List[float] = []
-        self.detections: List[bool] = []
-        self.pis: List[float] = []
-        self.times: List[int] = []
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, value) -> None:
+        self._data[self._end] = value
+        self._data[self._end + self.capacity] = value
+        self._end = (self._end + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
         
-    def update(self, x: float, t: int) -> Tuple[float, bool, float]:
-        """Update detector with new observation"""
-        self.observations.append(x)
-        self.times.append(t)
+    def extend(self, values: np.ndarray) -> None:
+        values = np.asarray(values)[-self.capacity:]
+        idx = (self._end + np.arange(len(values))) % self.capacity
+        self._data[idx] = values
+        self._data[idx + self.capacity] = values
+        self._end = (self._end + len(values)) % self.capacity
+        self._size = min(self._size + len(values), self.capacity)
         
-        # Compute likelihood ratio
-        lr = likelihood_ratio(
-            x, 
-            self.params.mu0, 
-            self.params.mu1, 
-            self.params.sigma
-        )
+    def view(self) -> np.ndarray:
+        """Oldest-to-newest read-only view, valid until the next write"""
+        stop = self._end + self.capacity
+        view = self._data[stop - self._size:stop]
+        view.flags.writeable = False
+        return view
+
+class MonitoredDetector:
+    """
+    Wraps a detector from the sr_detectors family with the bounded per-tick
+    history the monitor draws. Detectors without a posterior record NaN.
+    """
+    def __init__(self, detector: KernelDetector, capacity: int = HISTORY_CAPACITY):
+        self.detector = detector
         
-        # Update SR statistic recursively
-        self.R = (1 + self.R) * lr
-        self.Rs.append(self.R)
+        # Bounded history, only the last `capacity` ticks are kept
+        self._observations = RingBuffer(capacity)
+        self._stats = RingBuffer(capacity)
+        self._detections = RingBuffer(capacity, dtype=np.bool_)
+        self._pis = RingBuffer(capacity)
+        self._times = RingBuffer(capacity, dtype=np.int64)
         
-        # Compute posterior probability
-        pi = self.R / (1 + self.R)
-        self.pis.append(pi)
+    @property
+    def name(self) -> str:
+        return self.detector.name
+    
+    @property
+    def threshold(self) -> float:
+        return self.detector.threshold
+    
+    @property
+    def statistic(self) -> float:
+        return self.detector.statistic
+    
+    @property
+    def posterior(self) -> float:
+        """Current posterior probability of change, NaN if the detector has none"""
+        pis = self.detector.posterior(np.array([self.statistic]))
+        return np.nan if pis is None else float(pis[0])
+    
+    @property
+    def n_updates(self) -> int:
+        return self.detector.n_updates
+    
+    @property
+    def n_detections(self) -> int:
+        return self.detector.n_detections
         
-        # Check for detection
-        detection = self.R >= self.threshold
-        self.detections.append(detection)
+    @property
+    def observations(self) -> np.ndarray:
+        return self._observations.view()
+    
+    @property
+    def stats(self) -> np.ndarray:
+        return self._stats.view()
+    
+    @property
+    def detections(self) -> np.ndarray:
+        return self._detections.view()
+    
+    @property
+    def pis(self) -> np.ndarray:
+        return self._pis.view()
+    
+    @property
+    def times(self) -> np.ndarray:
+        return self._times.view()
+    
+    def update_batch(self, xs: np.ndarray, t0: int, record: bool = True
+                     ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Update detector with an array of observations starting at time t0.
+        Set record=False to skip the per-tick history for offline replay.
+        """
+        stats, detections = self.detector.update_batch(xs)
         
-        if detection:
-            self.R = 0  # Reset after detection
+        if record:
+            pis = self.detector.posterior(stats)
+            self._observations.extend(xs)
+            self._times.extend(np.arange(t0, t0 + len(xs)))
+            self._stats.extend(stats)
+            self._detections.extend(detections)
+            self._pis.extend(np.full(len(xs), np.nan) if pis is None else pis)
             
-        return self.R, detection, pi
+        return stats, detections
 
-def create_detector_plot(detector):
-    """Create plotly figure for detector state"""
-    fig = make_subplots(
-        rows=3, cols=1, 
-        subplot_titles=(
-            'Data Stream with Change Detection',
-            'Shiryaev-Roberts Statistic',
-            'Posterior Probability of Change'
-        )
-    )
+@jit(nopython=True)
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling, returns kept indices"""
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
     
-    # Data stream plot
-    fig.add_trace(
-        go.Scatter(x=detector.times, y=detector.observations, 
-                  name='Observations', line=dict(color='blue')),
-        row=1, col=1
-    )
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[n_out - 1] = n - 1
+    bucket = (n - 2) / (n_out - 2)
+    a = 0
     
-    # Add detection points
-    detections = np.where(detector.detections)[0]
-    if len(detections) > 0:
-        fig.add_trace(
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # Keep the point forming the largest triangle with the previous
+        # kept point and the average of the next bucket
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        idx[i + 1] = best
+        a = best
+        
+    return idx
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Keep the min and max of each bucket, returns sorted kept indices"""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n <= n_out or n_buckets < 1:
+        return np.arange(n)
+    
+    size = -(-n // n_buckets)
+    padded = np.pad(y, (0, n_buckets * size - n), mode='edge').reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    idx = np.concatenate([offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)])
+    return np.unique(np.minimum(idx, n - 1))
+
+def decimate(x: np.ndarray, y: np.ndarray, max_points: int, method: str = 'lttb'
+             ) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a trace to at most max_points using LTTB or min/max buckets"""
+    if len(x) <= max_points:
+        return x, y
+    if method == 'lttb':
+        idx = lttb_indices(x.astype(np.float64), y.astype(np.float64), max_points)
+    else:
+        idx = minmax_indices(y, max_points)
+    return x[idx], y[idx]
+
+class DetectorPlot:
+    """
+    Persistent three-panel figure for the detector state.
+    The subplot layout is built once; each frame only swaps the trace data
+    for the decimated visible window, so frame cost is bounded by
+    window_size and max_points rather than by total runtime.
+    """
+    def __init__(self, detector: MonitoredDetector, height: int, max_points: int = 1000,
+                 method: str = 'lttb'):
+        self.max_points = max_points
+        self.method = method
+        threshold = detector.threshold
+        
+        self.fig = make_subplots(
+            rows=3, cols=1, 
+            subplot_titles=(
+                'Data Stream with Change Detection',
+                f'{detector.name} Statistic',
+                'Posterior Probability of Change'
+            )
+        )
+        
+        # Data stream plot
+        self.fig.add_trace(
+            go.Scatter(x=[], y=[], name='Observations', line=dict(color='blue')),
+            row=1, col=1
+        )
+        
+        # Detection points
+        self.fig.add_trace(
             go.Scatter(
-                x=[detector.times[i] for i in detections],
-                y=[detector.observations[i] for i in detections],
+                x=[], y=[],
                 mode='markers',
                 name='Detections',
                 marker=dict(color='red', symbol='triangle-up', size=10)
             ),
             row=1, col=1
         )
+        
+        # Detection statistic plot
+        self.fig.add_trace(
+            go.Scatter(x=[], y=[], name='Statistic', line=dict(color='green')),
+            row=2, col=1
+        )
+        self.fig.add_hline(y=threshold, line_dash="dash", 
+                           line_color="red", name="Threshold",
+                           row=2, col=1)
+        
+        # Posterior probability plot
+        self.fig.add_trace(
+            go.Scatter(x=[], y=[], name='Posterior π', line=dict(color='blue')),
+            row=3, col=1
+        )
+        
+        # Update layout
+        self.fig.update_layout(
+            height=height, 
+            showlegend=True,
+            title_text=f"{detector.name} Change Detection Monitor"
+        )
+        self.fig.update_yaxes(range=[-5, 5], row=1, col=1, title_text="Value")
+        self.fig.update_yaxes(range=list(detector.detector.stat_range), row=2, col=1,
+                              title_text="Statistic")
+        self.fig.update_yaxes(range=[0, 1], row=3, col=1, title_text="Probability")
+        self.fig.update_xaxes(title_text="Time", row=3, col=1)
+        
+    def update(self, detector, window_size: Optional[int] = None) -> go.Figure:
+        """Refresh trace data from the last window_size ticks of detector"""
+        window = slice(-window_size, None) if window_size else slice(None)
+        times = detector.times[window]
+        observations = detector.observations[window]
+        detections = np.flatnonzero(detector.detections[window])
+        
+        pis = detector.pis[window]
+        if np.isnan(pis).all():
+            times_pi = pis = np.empty(0)  # Detector has no posterior
+        else:
+            times_pi, pis = decimate(times, pis, self.max_points, self.method)
+        
+        obs_trace, det_trace, stat_trace, pi_trace = self.fig.data
+        with self.fig.batch_update():
+            obs_trace.x, obs_trace.y = decimate(times, observations, self.max_points, self.method)
+            det_trace.x, det_trace.y = times[detections], observations[detections]
+            stat_trace.x, stat_trace.y = decimate(times, detector.stats[window], self.max_points, self.method)
+            pi_trace.x, pi_trace.y = times_pi, pis
+            
+        return self.fig
+
+@dataclass
+class DetectorSnapshot:
+    """Immutable copy of the detector state published by DetectorWorker"""
+    t: int
+    name: str
+    statistic: float
+    pi: float
+    threshold: float
+    n_detections: int
+    last_detection: Optional[int]
+    ticks_per_sec: float
+    times: np.ndarray
+    observations: np.ndarray
+    stats: np.ndarray
+    pis: np.ndarray
+    detections: np.ndarray
+
+class DetectorWorker(threading.Thread):
+    """
+    Feeds the detector from an observation source in a background thread.
+    The thread runs an asyncio IngestPipeline that hands micro-batches to
+    update_batch. Each publish builds a new DetectorSnapshot and swaps a
+    single reference, so the UI can read the latest snapshot at any time
+    without locking. If the source or the detector fails, the exception is
+    kept in `error` and the worker stops.
+    """
+    def __init__(self, detector: MonitoredDetector, source: ObservationSource,
+                 window_size: int, publish_interval: float = 0.05,
+                 max_batch: int = 8192, max_delay: float = 0.01):
+        super().__init__(daemon=True)
+        self.detector = detector
+        self.source = source
+        self.window_size = window_size
+        self.publish_interval = publish_interval
+        self.pipeline = IngestPipeline(source, self._consume_batch, max_batch, max_delay)
+        
+        self._stop_event = threading.Event()
+        self.error: Optional[Exception] = None
+        self._loop = None
+        self._task = None
+        self._last_detection = None
+        self._ticks_per_sec = 0.0
+        self._start = self._last_publish = time.perf_counter()
+        self._snapshot = self._take_snapshot()
+        
+    @property
+    def snapshot(self) -> DetectorSnapshot:
+        return self._snapshot
+    
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+    
+    def stop(self, wait: bool = False) -> None:
+        self._stop_event.set()
+        if self._loop is not None and self._task is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass  # Loop already finished
+        if wait and self.is_alive():
+            self.join()
+        
+    def _take_snapshot(self) -> DetectorSnapshot:
+        d = self.detector
+        window = slice(-self.window_size, None)
+        return DetectorSnapshot(
+            t=d.n_updates,
+            name=d.name,
+            statistic=d.statistic,
+            pi=d.posterior,
+            threshold=d.threshold,
+            n_detections=d.n_detections,
+            last_detection=self._last_detection,
+            ticks_per_sec=self._ticks_per_sec,
+            times=d.times[window].copy(),
+            observations=d.observations[window].copy(),
+            stats=d.stats[window].copy(),
+            pis=d.pis[window].copy(),
+            detections=d.detections[window].copy()
+        )
     
-    # SR statistic plot
-    fig.add_trace(
-        go.Scatter(x=detector.times, y=detector.Rs, 
-                  name='SR Statistic', line=dict(color='green')),
-        row=2, col=1
-    )
-    fig.add_hline(y=detector.threshold, line_dash="dash", 
-                  line_color="red", name="Threshold",
-                  row=2, col=1)
-    
-    # Posterior probability plot
-    fig.add_trace(
-        go.Scatter(x=detector.times, y=detector.pis, 
-                  name='Posterior π', line=dict(color='blue')),
-        row=3, col=1
-    )
+    def _consume_batch(self, xs: np.ndarray) -> None:
+        """Pipeline sink: run one micro-batch through the detector"""
+        t = self.detector.n_updates
+        _, detections = self.detector.update_batch(xs, t)
+        if detections.any():
+            self._last_detection = t + int(np.flatnonzero(detections)[-1])
+            
+        now = time.perf_counter()
+        if now - self._last_publish >= self.publish_interval:
+            self._ticks_per_sec = self.pipeline.n_received / (now - self._start)
+            self._snapshot = self._take_snapshot()
+            self._last_publish = now
+            
+    async def _main(self) -> None:
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        if self._stop_event.is_set():
+            return
+        try:
+            await self.pipeline.run()
+        except asyncio.CancelledError:
+            pass
+        
+    def run(self) -> None:
+        self._start = time.perf_counter()
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            self.error = e
+        finally:
+            self._stop_event.set()
+            self._snapshot = self._take_snapshot()
+
+def render_monitor(worker: DetectorWorker, detector_plot: DetectorPlot, window_size: int):
+    """Draw the latest published snapshot"""
+    if worker.error is not None:
+        if st.session_state.running:
+            st.rerun()  # Full rerun so main stops polling
+        st.error(f"❌ Monitor stopped: {worker.error}")
     
-    # Update layout
-    fig.update_layout(
-        height=st.session_state.plot_height, 
-        showlegend=True,
-        title_text="Shiryaev-Roberts Change Detection Monitor"
-    )
-    fig.update_yaxes(range=[-5, 5], row=1, col=1, title_text="Value")
-    fig.update_yaxes(range=[0, detector.threshold*1.2], row=2, col=1, title_text="SR Statistic")
-    fig.update_yaxes(range=[0, 1], row=3, col=1, title_text="Probability")
-    fig.update_xaxes(title_text="Time", row=3, col=1)
+    snap = worker.snapshot
+    fig = detector_plot.update(snap, window_size)
+    st.plotly_chart(fig, use_container_width=True)
     
-    return fig
+    stats = f"""
+    ### Current Statistics
+    - **Time**: {snap.t}
+    - **{snap.name} Statistic**: {snap.statistic:.2f}
+    - **Posterior Probability**: {'n/a' if np.isnan(snap.pi) else f'{snap.pi:.2f}'}
+    - **Total Detections**: {snap.n_detections}
+    - **Throughput**: {snap.ticks_per_sec:,.0f} ticks/s
+    - **Dropped**: {worker.pipeline.n_dropped}
+    """
+    st.markdown(stats)
+    
+    if snap.last_detection is not None:
+        st.warning(f"🚨 Change detected at time {snap.last_detection}!")
 
 def main():
     st.set_page_config(layout="wide", page_title="SR Change Detection")
@@ -194,11 +500,18 @@ def main():
     
     # Detection Parameters
     with st.sidebar.expander("Detection Parameters", expanded=True):
+        # Keyed to its session value so the choice survives reruns
+        st.selectbox(
+            "Detector",
+            DETECTOR_KINDS,
+            key='detector_kind',
+            help="Shiryaev alarms on the posterior using the prior below"
+        )
         st.session_state.threshold = st.number_input(
             "Detection threshold (A)", 
             value=st.session_state.threshold,
             min_value=1.0,
-            help="Threshold for declaring a change"
+            help="SR threshold; CUSUM alarms at log A"
         )
         st.session_state.change_point = st.number_input(
             "Change Point", 
@@ -207,29 +520,67 @@ def main():
             help="Time at which the change occurs"
         )
     
+    # Calibration of the SR threshold against ARL and detection delay. It
+    # simulates the SR recursion only, so it is offered for SR alone
+    with st.sidebar.expander("Calibration (Shiryaev-Roberts)", expanded=False):
+        if st.session_state.detector_kind != 'Shiryaev-Roberts':
+            st.caption("Calibration simulates the Shiryaev-Roberts threshold A; "
+                       "select Shiryaev-Roberts as the detector to use it")
+        else:
+            cache = CalibrationCache()
+            model = (st.session_state.mu0, st.session_state.mu1, st.session_state.sigma)
+            st.session_state.target_arl = st.number_input(
+                "Target ARL", 
+                value=st.session_state.target_arl,
+                min_value=10.0,
+                help="Average run length to false alarm to solve the threshold for"
+            )
+            if st.button("Solve threshold"):
+                with st.spinner("Simulating..."):
+                    result = cache.solve(*model, st.session_state.target_arl)
+                st.session_state.threshold = result.threshold
+                # Rebuild the detector, worker and plot around the new threshold
+                if 'worker' in st.session_state:
+                    st.session_state.worker.stop(wait=True)
+                for key in ('detector', 'worker', 'detector_plot'):
+                    st.session_state.pop(key, None)
+                st.rerun()
+        
+            result = cache.lookup(*model, st.session_state.threshold)
+            if result is None and st.button("Estimate ARL / delay"):
+                with st.spinner("Simulating..."):
+                    result = cache.evaluate(*model, st.session_state.threshold)
+            if result is not None:
+                st.markdown(f"""
+                - **ARL to false alarm**: {result.arl:.1f} ± {result.arl_se:.1f}
+                - **Detection delay**: {result.delay:.2f} ± {result.delay_se:.2f}
+                """)
+            else:
+                st.caption("No cached calibration for these parameters")
+    
     # Prior Parameters
     st.sidebar.header("🎲 Prior Parameters")
     with st.sidebar.expander("Prior Distribution", expanded=False):
         st.session_state.alpha = st.number_input(
             "Alpha (α)", 
             value=st.session_state.alpha,
-            min_value=0.0,
-            max_value=1.0,
-            help="Parameter for geometric prior"
+            min_value=0.001,
+            max_value=0.999,
+            help="Shiryaev alarms once the posterior exceeds 1 - α"
         )
         st.session_state.rho = st.number_input(
             "Rho (ρ)", 
             value=st.session_state.rho,
-            min_value=0.0,
-            max_value=1.0,
-            help="Conditional probability"
+            min_value=0.001,
+            max_value=0.999,
+            help="Parameter of the geometric prior on the change time"
         )
         st.session_state.pi = st.number_input(
             "Pi (π)", 
             value=st.session_state.pi,
-            min_value=0.0,
-            max_value=1.0,
-            help="Initial probability"
+            min_value=0.001,
+            max_value=0.999,
+            help="Prior probability that the change happened before the first observation"
         )
     
     # Display Parameters
@@ -239,8 +590,21 @@ def main():
             "Window Size", 
             value=st.session_state.window_size,
             min_value=50,
+            max_value=HISTORY_CAPACITY,
             help="Number of observations to display"
         )
+        st.session_state.max_points = st.number_input(
+            "Max Points per Trace", 
+            value=st.session_state.max_points,
+            min_value=10,
+            help="Traces are downsampled to at most this many points"
+        )
+        st.session_state.downsample = st.selectbox(
+            "Downsampling", 
+            options=['lttb', 'minmax'],
+            index=['lttb', 'minmax'].index(st.session_state.downsample),
+            help="LTTB keeps the visual shape, min/max keeps every extreme"
+        )
         st.session_state.update_interval = st.slider(
             "Update Interval", 
             min_value=0.01,
@@ -249,6 +613,38 @@ def main():
             help="Time between updates (seconds)"
         )
     
+    # Data source
+    st.sidebar.header("📡 Data Source")
+    with st.sidebar.expander("Observations", expanded=False):
+        source_options = ['Simulated', 'File tail', 'Replay file', 'TCP', 'UDP']
+        st.session_state.source = st.selectbox(
+            "Source", 
+            options=source_options,
+            index=source_options.index(st.session_state.source),
+            help="Where observations come from (applies on Reset)"
+        )
+        if st.session_state.source in ('Simulated', 'Replay file'):
+            st.session_state.tick_rate = st.number_input(
+                "Tick Rate", 
+                value=st.session_state.tick_rate,
+                min_value=0,
+                help="Observations per second (0 = as fast as possible)"
+            )
+        if st.session_state.source in ('File tail', 'Replay file'):
+            st.session_state.source_path = st.text_input(
+                "File Path", 
+                value=st.session_state.source_path,
+                help="Text file with one observation per line, or a .npy array"
+            )
+        if st.session_state.source in ('TCP', 'UDP'):
+            st.session_state.source_port = st.number_input(
+                "Port", 
+                value=st.session_state.source_port,
+                min_value=1,
+                max_value=65535,
+                help="Local port to listen on for newline-delimited values"
+            )
+    
     # Initialize detector
     params = SRParameters(
         alpha=st.session_state.alpha,
@@ -259,12 +655,52 @@ def main():
         sigma=st.session_state.sigma
     )
     
+    def new_detector() -> MonitoredDetector:
+        return MonitoredDetector(build_detector(
+            st.session_state.detector_kind, params, st.session_state.threshold))
+    
+    # Switching detector restarts the monitor, like Reset
+    if ('detector' in st.session_state
+            and st.session_state.detector.name != st.session_state.detector_kind):
+        st.session_state.worker.stop(wait=True)
+        for key in ('detector', 'worker', 'detector_plot'):
+            st.session_state.pop(key, None)
+    
     if 'detector' not in st.session_state:
-        st.session_state.detector = ShiryaevRobertsDetector(params, st.session_state.threshold)
+        st.session_state.detector = new_detector()
+    
+    def new_source() -> ObservationSource:
+        kind = st.session_state.source
+        if kind == 'File tail':
+            return FileTailSource(st.session_state.source_path)
+        if kind == 'Replay file':
+            return ReplaySource(st.session_state.source_path, rate=st.session_state.tick_rate)
+        if kind == 'TCP':
+            return TCPSource(port=st.session_state.source_port)
+        if kind == 'UDP':
+            return UDPSource(port=st.session_state.source_port)
+        return SimulatedSource(
+            st.session_state.mu0,
+            st.session_state.mu1,
+            st.session_state.sigma,
+            st.session_state.change_point,
+            rate=st.session_state.tick_rate,
+            t0=st.session_state.detector.n_updates
+        )
+    
+    def new_worker():
+        return DetectorWorker(
+            st.session_state.detector,
+            new_source(),
+            st.session_state.window_size
+        )
+    
+    if 'worker' not in st.session_state:
+        st.session_state.worker = new_worker()
     
-    # Create placeholders for plots and stats
-    plot_placeholder = st.empty()
-    stats_placeholder = st.empty()
+    # A failed worker stays stopped until Start or Reset is clicked again
+    if st.session_state.worker.error is not None:
+        st.session_state.running = False
     
     # Control buttons
     col1, col2, col3 = st.columns(3)
@@ -274,7 +710,10 @@ def main():
     with col2:
         if st.button('🔄 Reset'):
             st.session_state.running = False
-            st.session_state.detector = ShiryaevRobertsDetector(params, st.session_state.threshold)
+            st.session_state.worker.stop(wait=True)
+            st.session_state.detector = new_detector()
+            st.session_state.worker = new_worker()
+            st.session_state.pop('detector_plot', None)
     with col3:
         if st.button('❓ Help'):
             st.info("""
@@ -285,37 +724,33 @@ def main():
             4. Click Reset to start over
             """)
     
-    # Main simulation loop
-    while st.session_state.running:
-        t = len(st.session_state.detector.observations)
-        
-        # Generate observation
-        if t < st.session_state.change_point:
-            x = np.random.normal(st.session_state.mu0, st.session_state.sigma)
-        else:
-            x = np.random.normal(st.session_state.mu1, st.session_state.sigma)
-            
-        # Update detector
-        R, detection, pi = st.session_state.detector.update(x, t)
-        
-        # Update plot
-        fig = create_detector_plot(st.session_state.detector)
-        plot_placeholder.plotly_chart(fig, use_container_width=True)
-        
-        # Update stats
-        stats = f"""
-        ### Current Statistics
-        - **Time**: {t}
-        - **SR Statistic**: {R:.2f}
-        - **Posterior Probability**: {pi:.2f}
-        - **Total Detections**: {sum(st.session_state.detector.detections)}
-        """
-        stats_placeholder.markdown(stats)
-        
-        if detection:
-            st.warning(f"🚨 Change detected at time {t}!")
-        
-        time.sleep(st.session_state.update_interval)
+    # The detector runs in a background thread; a stopped thread cannot be
+    # restarted, so resuming starts a new worker on the same detector
+    worker = st.session_state.worker
+    if st.session_state.running and (not worker.is_alive() or worker.stopped):
+        if worker.ident is not None:
+            worker.stop(wait=True)
+            worker = st.session_state.worker = new_worker()
+        worker.start()
+    elif not st.session_state.running and worker.is_alive():
+        worker.stop()
+    
+    # Plot is built once and only its trace data changes per frame
+    if 'detector_plot' not in st.session_state:
+        st.session_state.detector_plot = DetectorPlot(
+            st.session_state.detector,
+            st.session_state.plot_height,
+            st.session_state.max_points,
+            st.session_state.downsample
+        )
+    detector_plot = st.session_state.detector_plot
+    detector_plot.max_points = st.session_state.max_points
+    detector_plot.method = st.session_state.downsample
+    
+    # Poll the worker's snapshot at a fixed frame rate without blocking reruns
+    run_every = st.session_state.update_interval if st.session_state.running else None
+    st.fragment(run_every=run_every)(render_monitor)(
+        worker, detector_plot, st.session_state.window_size)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,150 @@
+"""
+Monte Carlo calibration of the Shiryaev-Roberts threshold.
+Estimates the average run length to false alarm (ARL) and the detection
+delay for a threshold, solves for the threshold meeting a target ARL and
+caches results on disk for the monitor's sidebar.
+"""
+import os
+import json
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional
+from sr_kernels import sr_run_lengths
+
+CACHE_FILE = 'sr_calibration.json'
+
+@dataclass
+class CalibrationResult:
+    """ARL to false alarm and detection delay for one threshold"""
+    threshold: float
+    arl: float
+    arl_se: float
+    delay: float
+    delay_se: float
+    n_paths: int
+
+def _run_lengths_chunk(path_ids, mu, mu0, mu1, sigma, threshold, max_steps, seed):
+    """Worker entry point: simulate one slice of paths"""
+    return sr_run_lengths(path_ids, mu, mu0, mu1, sigma, threshold, max_steps, seed)
+
+def simulate_run_lengths(mu, mu0, mu1, sigma, threshold, n_paths=2000, max_steps=10**7,
+                         seed=0, executor: Optional[ProcessPoolExecutor] = None) -> np.ndarray:
+    """
+    Simulate n_paths SR stopping times with observations from N(mu, sigma).
+    Paths are split across the executor's workers when one is given; results
+    do not depend on the split because every path is seeded by its id.
+    """
+    path_ids = np.arange(n_paths, dtype=np.int64)
+    if executor is None:
+        return sr_run_lengths(path_ids, mu, mu0, mu1, sigma, threshold, max_steps, seed)
+
+    # Several slices per core so uneven path lengths balance out
+    n_chunks = 4 * (os.cpu_count() or 1)
+    futures = [
+        executor.submit(_run_lengths_chunk, ids, mu, mu0, mu1, sigma, threshold, max_steps, seed)
+        for ids in np.array_split(path_ids, n_chunks) if len(ids)
+    ]
+    return np.concatenate([future.result() for future in futures])
+
+def evaluate_threshold(mu0, mu1, sigma, threshold, n_paths=2000, max_steps=10**7, seed=0,
+                       executor: Optional[ProcessPoolExecutor] = None) -> CalibrationResult:
+    """
+    ARL from paths that never change (all N(mu0, sigma)) and detection delay
+    from paths that are post-change from the first observation.
+    """
+    pre = simulate_run_lengths(mu0, mu0, mu1, sigma, threshold, n_paths, max_steps, seed, executor)
+    post = simulate_run_lengths(mu1, mu0, mu1, sigma, threshold, n_paths, max_steps, seed, executor)
+    return CalibrationResult(
+        threshold=float(threshold),
+        arl=float(pre.mean()),
+        arl_se=float(pre.std() / np.sqrt(n_paths)),
+        delay=float(post.mean()),
+        delay_se=float(post.std() / np.sqrt(n_paths)),
+        n_paths=n_paths
+    )
+
+def solve_threshold(mu0, mu1, sigma, target_arl, n_paths=2000, seed=0, rtol=0.01,
+                    executor: Optional[ProcessPoolExecutor] = None) -> CalibrationResult:
+    """
+    Bisect on log(threshold) for the threshold whose simulated ARL meets
+    target_arl. Paths reuse their draws for every candidate, so the
+    estimated ARL is monotone in the threshold. Since ARL >= threshold for
+    SR, the target itself is a valid upper bracket.
+    """
+    max_steps = int(100 * target_arl)
+    lo, hi = 0.0, np.log(target_arl)
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        run_lengths = simulate_run_lengths(mu0, mu0, mu1, sigma, np.exp(mid), n_paths,
+                                           max_steps, seed, executor)
+        if run_lengths.mean() < target_arl:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo < rtol:
+            break
+    return evaluate_threshold(mu0, mu1, sigma, np.exp(hi), n_paths, max_steps, seed, executor)
+
+class CalibrationCache:
+    """JSON file of (mu0, mu1, sigma, threshold) -> CalibrationResult"""
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(mu0, mu1, sigma, threshold) -> str:
+        return f"{mu0:.6g},{mu1:.6g},{sigma:.6g},{threshold:.6g}"
+
+    def lookup(self, mu0, mu1, sigma, threshold) -> Optional[CalibrationResult]:
+        entry = self.entries.get(self.key(mu0, mu1, sigma, threshold))
+        return CalibrationResult(**entry) if entry else None
+
+    def store(self, mu0, mu1, sigma, result: CalibrationResult) -> None:
+        self.entries[self.key(mu0, mu1, sigma, result.threshold)] = asdict(result)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def evaluate(self, mu0, mu1, sigma, threshold, n_workers=None, **kwargs) -> CalibrationResult:
+        """Cached evaluate_threshold, simulating across n_workers processes on a miss"""
+        result = self.lookup(mu0, mu1, sigma, threshold)
+        if result is None:
+            with ProcessPoolExecutor(n_workers) as executor:
+                result = evaluate_threshold(mu0, mu1, sigma, threshold, executor=executor, **kwargs)
+            self.store(mu0, mu1, sigma, result)
+        return result
+
+    def solve(self, mu0, mu1, sigma, target_arl, n_workers=None, **kwargs) -> CalibrationResult:
+        """solve_threshold across n_workers processes, caching the result"""
+        with ProcessPoolExecutor(n_workers) as executor:
+            result = solve_threshold(mu0, mu1, sigma, target_arl, executor=executor, **kwargs)
+        self.store(mu0, mu1, sigma, result)
+        return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the Shiryaev-Roberts threshold")
+    parser.add_argument('--mu0', type=float, default=0.0)
+    parser.add_argument('--mu1', type=float, default=2.0)
+    parser.add_argument('--sigma', type=float, default=1.0)
+    parser.add_argument('--threshold', type=float, default=None)
+    parser.add_argument('--target-arl', type=float, default=1000.0)
+    parser.add_argument('--n-paths', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    cache = CalibrationCache()
+    if args.threshold is not None:
+        result = cache.evaluate(args.mu0, args.mu1, args.sigma, args.threshold,
+                                n_workers=args.workers, n_paths=args.n_paths)
+    else:
+        result = cache.solve(args.mu0, args.mu1, args.sigma, args.target_arl,
+                             n_workers=args.workers, n_paths=args.n_paths)
+    print(f"Threshold: {result.threshold:.4f}")
+    print(f"ARL to false alarm: {result.arl:.1f} ± {result.arl_se:.1f}")
+    print(f"Detection delay: {result.delay:.2f} ± {result.delay_se:.2f}")
@@ -0,0 +1,304 @@
+"""
+Change detector family sharing the jitted kernel interface in sr_kernels,
+plus a head-to-head benchmark on identical simulated streams.
+Run `python sr_detectors.py` to print the comparison.
+"""
+import time
+import argparse
+import numpy as np
+from types import SimpleNamespace
+from typing import Optional, Tuple
+from sr_kernels import (sr_batch_kernel, cusum_kernel, shiryaev_kernel, ewma_kernel, sr_bank_kernel,
+                        log_sr_batch_kernel)
+
+class KernelDetector:
+    """
+    Detector driven by a jitted kernel(xs, state, params) -> (stats, detections).
+    All members of the family share this interface, so they can be swapped
+    or benchmarked against each other on identical streams. `threshold` is
+    the alarm level and `statistic` the latest value, both on the scale of
+    the kernel's statistic (which defaults to the state itself).
+    """
+    name = 'Kernel'
+
+    def __init__(self, kernel, params, initial_state: float, threshold: float,
+                 initial_statistic: Optional[float] = None):
+        self.kernel = kernel
+        self.params = np.asarray(params, dtype=np.float64)
+        self.initial_state = initial_state
+        self.initial_statistic = initial_state if initial_statistic is None else initial_statistic
+        self.threshold = threshold
+        self.state = np.array([initial_state])
+        self.statistic = self.initial_statistic
+        self.n_updates = 0
+        self.n_detections = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of state and parameters held between batches"""
+        return self.state.nbytes + self.params.nbytes
+
+    @property
+    def stat_range(self) -> Tuple[float, float]:
+        """Plotting range for the statistic"""
+        return 0.0, 1.2 * self.threshold
+
+    def posterior(self, stats: np.ndarray) -> Optional[np.ndarray]:
+        """Posterior probability of change implied by stats, if the detector has one"""
+        return None
+
+    def reset(self) -> None:
+        self.state[0] = self.initial_state
+        self.statistic = self.initial_statistic
+        self.n_updates = 0
+        self.n_detections = 0
+
+    def update_batch(self, xs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the kernel over xs, returns per-tick statistics and detections"""
+        xs = np.ascontiguousarray(xs, dtype=np.float64)
+        stats, detections = self.kernel(xs, self.state, self.params)
+        if len(xs):
+            self.statistic = float(stats[-1])
+        self.n_updates += len(xs)
+        self.n_detections += int(np.count_nonzero(detections))
+        return stats, detections
+
+class ShiryaevRobertsDetector(KernelDetector):
+    """Shiryaev-Roberts, alarms when R >= threshold"""
+    name = 'Shiryaev-Roberts'
+
+    def __init__(self, mu0: float, mu1: float, sigma: float, threshold: float):
+        super().__init__(sr_batch_kernel, [mu0, mu1, sigma, threshold], 0.0, threshold)
+
+    def posterior(self, stats: np.ndarray) -> np.ndarray:
+        return stats / (1 + stats)
+
+class CUSUMDetector(KernelDetector):
+    """Page's CUSUM, alarms when the log-likelihood CUSUM reaches h"""
+    name = 'CUSUM'
+
+    def __init__(self, mu0: float, mu1: float, sigma: float, h: float):
+        super().__init__(cusum_kernel, [mu0, mu1, sigma, h], 0.0, h)
+
+class ShiryaevDetector(KernelDetector):
+    """Bayesian Shiryaev procedure with a geometric(rho) prior on the change time"""
+    name = 'Shiryaev'
+
+    def __init__(self, mu0: float, mu1: float, sigma: float, rho: float, pi: float,
+                 p_alarm: float):
+        for name, value in (('rho', rho), ('pi', pi), ('p_alarm', p_alarm)):
+            if not 0 < value < 1:
+                raise ValueError(f"{name} must be in (0, 1), got {value}")
+        # State is the posterior odds, the statistic the posterior itself
+        super().__init__(shiryaev_kernel, [mu0, mu1, sigma, rho, pi, p_alarm],
+                         pi / (1 - pi), p_alarm, initial_statistic=pi)
+
+    @property
+    def stat_range(self) -> Tuple[float, float]:
+        return 0.0, 1.0
+
+    def posterior(self, stats: np.ndarray) -> np.ndarray:
+        return stats
+
+    @classmethod
+    def from_params(cls, params) -> 'ShiryaevDetector':
+        """Use the sidebar prior, alarming once the posterior exceeds 1 - alpha"""
+        if not 0 < params.alpha < 1:
+            raise ValueError(f"alpha must be in (0, 1), got {params.alpha}")
+        return cls(params.mu0, params.mu1, params.sigma, params.rho, params.pi, 1 - params.alpha)
+
+class EWMADetector(KernelDetector):
+    """One-sided EWMA chart with L-sigma asymptotic limits"""
+    name = 'EWMA'
+
+    def __init__(self, mu0: float, mu1: float, sigma: float, lam: float = 0.1, L: float = 3.0):
+        self.limit = L * sigma * np.sqrt(lam / (2 - lam))
+        direction = 1.0 if mu1 >= mu0 else -1.0
+        super().__init__(ewma_kernel, [mu0, mu1, sigma, lam, L], mu0,
+                         mu0 + direction * self.limit)
+
+    @property
+    def stat_range(self) -> Tuple[float, float]:
+        mu0 = self.params[0]
+        return mu0 - 1.5 * self.limit, mu0 + 1.5 * self.limit
+
+class SRDetectorBank:
+    """
+    Many independent Shiryaev-Roberts detectors updated together.
+    Statistics and per-stream parameters are 1-D arrays; scalars are
+    broadcast across all n_streams.
+    """
+    def __init__(self, n_streams: int, mu0, mu1, sigma, threshold):
+        def as_array(value):
+            return np.ascontiguousarray(np.broadcast_to(value, n_streams), dtype=np.float64)
+        
+        self.n_streams = n_streams
+        self.mu0 = as_array(mu0)
+        self.mu1 = as_array(mu1)
+        self.sigma = as_array(sigma)
+        self.threshold = as_array(threshold)
+        
+        self.R = np.zeros(n_streams)
+        self.n_detections = np.zeros(n_streams, dtype=np.int64)
+        self.n_updates = 0
+        self._fired = np.empty(n_streams, dtype=np.int64)
+        
+    @property
+    def pis(self) -> np.ndarray:
+        """Posterior probability of change for every stream"""
+        return self.R / (1 + self.R)
+        
+    def update(self, xs: np.ndarray) -> np.ndarray:
+        """Feed one observation per stream, returns indices of streams that fired"""
+        xs = np.ascontiguousarray(xs, dtype=np.float64)
+        n_fired = sr_bank_kernel(xs, self.R, self.mu0, self.mu1, self.sigma,
+                                 self.threshold, self.n_detections, self._fired)
+        self.n_updates += 1
+        return self._fired[:n_fired].copy()
+    
+    def reset(self, streams: Optional[np.ndarray] = None) -> None:
+        """Zero the SR statistic for the given streams, or all of them"""
+        if streams is None:
+            self.R[:] = 0.0
+        else:
+            self.R[streams] = 0.0
+
+class LogSRDetector:
+    """
+    Shiryaev-Roberts detector for an unknown post-change mean.
+    Tracks log R for a grid of candidate means and detects on the
+    log-sum-exp mixture, so large shifts and long runs cannot overflow.
+    """
+    def __init__(self, mu0: float, sigma: float, mus: np.ndarray, threshold: float,
+                 weights: Optional[np.ndarray] = None):
+        self.mu0 = mu0
+        self.sigma = sigma
+        self.mus = np.ascontiguousarray(mus, dtype=np.float64)
+        self.threshold = threshold
+        
+        # Uniform prior over the candidate means by default
+        if weights is None:
+            weights = np.ones(len(self.mus))
+        self.weights = np.asarray(weights, dtype=np.float64) / np.sum(weights)
+        
+        # log R_k = shift + log r_k, starting from R_k = 0
+        self._r = np.zeros(len(self.mus))
+        self._shift = np.zeros(1)
+        self.n_updates = 0
+        self.n_detections = 0
+        
+    @property
+    def log_R(self) -> np.ndarray:
+        """Log SR statistic for every candidate mean"""
+        with np.errstate(divide='ignore'):
+            return self._shift[0] + np.log(self._r)
+    
+    @property
+    def log_statistic(self) -> float:
+        """Current log of the mixture statistic sum_k w_k R_k"""
+        with np.errstate(divide='ignore'):
+            return self._shift[0] + np.log(np.dot(self.weights, self._r))
+    
+    @property
+    def most_likely_mu(self) -> float:
+        """Candidate post-change mean with the largest weighted statistic"""
+        return self.mus[np.argmax(self.weights * self._r)]
+    
+    def update_batch(self, xs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Update detector with an array of observations.
+        Returns the log mixture statistic, most likely mean and detections.
+        """
+        xs = np.ascontiguousarray(xs, dtype=np.float64)
+        log_stats, best_mus, detections = log_sr_batch_kernel(
+            xs,
+            self._r,
+            self._shift,
+            self.mus,
+            self.weights,
+            self.mu0,
+            self.sigma,
+            np.log(self.threshold)
+        )
+        self.n_updates += len(xs)
+        self.n_detections += int(np.count_nonzero(detections))
+        return log_stats, best_mus, detections
+    
+    def update(self, x: float) -> Tuple[float, bool, float]:
+        """Update detector with new observation"""
+        log_stats, best_mus, detections = self.update_batch(np.array([x]))
+        return log_stats[0], bool(detections[0]), best_mus[0]
+
+DETECTOR_KINDS = ('Shiryaev-Roberts', 'CUSUM', 'Shiryaev', 'EWMA')
+
+def build_detector(kind: str, params, threshold: float) -> KernelDetector:
+    """
+    Build a detector of the family from the monitor's parameters.
+    threshold is the SR threshold A; CUSUM alarms at log A, Shiryaev uses
+    the alpha/rho/pi prior and EWMA its default limits.
+    """
+    if kind == 'Shiryaev-Roberts':
+        return ShiryaevRobertsDetector(params.mu0, params.mu1, params.sigma, threshold)
+    if kind == 'CUSUM':
+        return CUSUMDetector(params.mu0, params.mu1, params.sigma, np.log(threshold))
+    if kind == 'Shiryaev':
+        return ShiryaevDetector.from_params(params)
+    if kind == 'EWMA':
+        return EWMADetector(params.mu0, params.mu1, params.sigma)
+    raise ValueError(f"Unknown detector: {kind}")
+
+def benchmark_detectors(params, threshold: float, n_ticks: int = 10**7,
+                        seed: int = 0):
+    """
+    Replay identical simulated streams through every detector in the family.
+    params carries mu0, mu1, sigma and the alpha/rho/pi prior (SRParameters).
+    Detectors reset after each alarm, so ARL is pre-change ticks per false
+    alarm and delay is post-change ticks per alarm (change at time 0).
+    """
+    detectors = [build_detector(kind, params, threshold) for kind in DETECTOR_KINDS]
+
+    rng = np.random.default_rng(seed)
+    pre_change = rng.normal(params.mu0, params.sigma, n_ticks)
+    post_change = rng.normal(params.mu1, params.sigma, n_ticks // 10)
+
+    results = []
+    print(f"{'Detector':<18} {'ticks/s':>14} {'state B':>8} {'out MB':>8} {'ARL':>12} {'delay':>8}")
+    for detector in detectors:
+        # Compile outside the timed region
+        detector.update_batch(pre_change[:100])
+        detector.reset()
+
+        start = time.perf_counter()
+        stats, detections = detector.update_batch(pre_change)
+        ticks_per_sec = n_ticks / (time.perf_counter() - start)
+        output_mb = (stats.nbytes + detections.nbytes) / 1e6
+        false_alarms = detector.n_detections
+
+        detector.reset()
+        detector.update_batch(post_change)
+        alarms = detector.n_detections
+
+        arl = n_ticks / false_alarms if false_alarms else np.inf
+        delay = len(post_change) / alarms if alarms else np.inf
+        results.append(dict(name=detector.name, ticks_per_sec=ticks_per_sec,
+                            state_bytes=detector.memory_bytes, output_mb=output_mb,
+                            arl=arl, delay=delay))
+        print(f"{detector.name:<18} {ticks_per_sec:>14,.0f} {detector.memory_bytes:>8} "
+              f"{output_mb:>8.1f} {arl:>12,.1f} {delay:>8.2f}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the change detector family")
+    parser.add_argument('--mu0', type=float, default=0.0)
+    parser.add_argument('--mu1', type=float, default=2.0)
+    parser.add_argument('--sigma', type=float, default=1.0)
+    parser.add_argument('--alpha', type=float, default=0.1)
+    parser.add_argument('--rho', type=float, default=0.1)
+    parser.add_argument('--pi', type=float, default=0.1)
+    parser.add_argument('--threshold', type=float, default=100.0)
+    parser.add_argument('--ticks', type=int, default=10**7)
+    args = parser.parse_args()
+
+    params = SimpleNamespace(mu0=args.mu0, mu1=args.mu1, sigma=args.sigma,
+                             alpha=args.alpha, rho=args.rho, pi=args.pi)
+    benchmark_detectors(params, args.threshold, n_ticks=args.ticks)
@@ -0,0 +1,188 @@
+"""
+Jitted Shiryaev-Roberts kernels shared by the monitor and the calibration
+engine. Kept in an importable module so process-pool workers can use them.
+"""
+import numpy as np
+from numba import jit, float64
+
+@jit(float64(float64, float64, float64, float64), nopython=True)
+def likelihood_ratio(x: float, mu0: float, mu1: float, sigma: float) -> float:
+    """Compute likelihood ratio for normal distributions"""
+    return np.exp((-(x - mu1)**2 + (x - mu0)**2) / (2 * sigma**2))
+
+@jit(nopython=True)
+def sr_bank_kernel(xs, R, mu0, mu1, sigma, threshold, counts, fired):
+    """
+    One SR step for every stream in a bank, updating R and counts in place.
+    Writes the indices of streams that fired into `fired`, returns how many.
+    """
+    n_fired = 0
+    for i in range(xs.shape[0]):
+        R[i] = (1 + R[i]) * likelihood_ratio(xs[i], mu0[i], mu1[i], sigma[i])
+        if R[i] >= threshold[i]:
+            fired[n_fired] = i
+            n_fired += 1
+            counts[i] += 1
+            R[i] = 0.0  # Reset after detection
+    return n_fired
+
+@jit(nopython=True)
+def sr_run_lengths(path_ids, mu, mu0, mu1, sigma, threshold, max_steps, seed):
+    """
+    Simulate SR stopping times with observations drawn from N(mu, sigma).
+    Each path reseeds from (seed, path id), so a path sees the same draws
+    whatever the threshold or how paths are split across workers.
+    Paths still running after max_steps are stopped there.
+    """
+    run_lengths = np.empty(path_ids.shape[0], dtype=np.int64)
+    for p in range(path_ids.shape[0]):
+        np.random.seed((seed * 1000003 + path_ids[p]) % 4294967296)
+        R = 0.0
+        n = 0
+        while R < threshold and n < max_steps:
+            x = np.random.normal(mu, sigma)
+            R = (1 + R) * likelihood_ratio(x, mu0, mu1, sigma)
+            n += 1
+        run_lengths[p] = n
+    return run_lengths
+
+@jit(nopython=True)
+def log_sr_batch_kernel(xs, r, shift, mus, weights, mu0, sigma, log_threshold):
+    """
+    Log-domain SR recursion for a grid of candidate post-change means.
+    The state is log R_k = shift[0] + log r_k with max_k r_k = 1, i.e. a
+    log-sum-exp held around its running max. Both arrays update in place,
+    and each tick costs one exp per candidate and nothing can overflow.
+    Returns the log mixture statistic log(sum_k w_k R_k), the most likely
+    candidate mean and the detection flag for every observation.
+    """
+    n = xs.shape[0]
+    K = mus.shape[0]
+    log_stats = np.empty(n)
+    best_mus = np.empty(n)
+    detections = np.empty(n, dtype=np.bool_)
+    log_lr = np.empty(K)
+    
+    for i in range(n):
+        # log(1 + R_k) = base + log(exp(-base) + r_k exp(shift - base))
+        base = max(shift[0], 0.0)
+        one = np.exp(-base)
+        scale = np.exp(shift[0] - base)
+        
+        top = -np.inf
+        for k in range(K):
+            log_lr[k] = (mus[k] - mu0) * (xs[i] - 0.5 * (mu0 + mus[k])) / sigma**2
+            top = max(top, log_lr[k])
+        
+        peak = 0.0
+        for k in range(K):
+            r[k] = (one + r[k] * scale) * np.exp(log_lr[k] - top)
+            peak = max(peak, r[k])
+        
+        # Renormalise so the largest candidate is 1
+        total = 0.0
+        best = 0
+        best_weighted = -1.0
+        for k in range(K):
+            r[k] /= peak
+            weighted = weights[k] * r[k]
+            total += weighted
+            if weighted > best_weighted:
+                best_weighted = weighted
+                best = k
+        shift[0] = base + top + np.log(peak)
+        
+        log_stats[i] = shift[0] + np.log(total)
+        best_mus[i] = mus[best]
+        
+        detections[i] = log_stats[i] >= log_threshold
+        if detections[i]:
+            r[:] = 0.0  # Reset after detection
+            shift[0] = 0.0
+            
+    return log_stats, best_mus, detections
+
+# Detector family kernels. Every kernel has the signature
+#     kernel(xs, state, params) -> (stats, detections)
+# where `state` is a float64 array updated in place (so batches chain) and
+# `params` a float64 array of the detector's parameters. Each detector
+# resets its own state after a detection.
+
+@jit(nopython=True, nogil=True)
+def sr_batch_kernel(xs, state, params):
+    """Shiryaev-Roberts, params = (mu0, mu1, sigma, A), state = (R,)"""
+    mu0, mu1, sigma, A = params[0], params[1], params[2], params[3]
+    stats = np.empty(xs.shape[0])
+    detections = np.empty(xs.shape[0], dtype=np.bool_)
+    R = state[0]
+    for i in range(xs.shape[0]):
+        R = (1 + R) * likelihood_ratio(xs[i], mu0, mu1, sigma)
+        stats[i] = R
+        detections[i] = R >= A
+        if detections[i]:
+            R = 0.0  # Reset after detection
+    state[0] = R
+    return stats, detections
+
+@jit(nopython=True, nogil=True)
+def cusum_kernel(xs, state, params):
+    """Page's CUSUM, params = (mu0, mu1, sigma, h), state = (W,)"""
+    mu0, mu1, sigma, h = params[0], params[1], params[2], params[3]
+    stats = np.empty(xs.shape[0])
+    detections = np.empty(xs.shape[0], dtype=np.bool_)
+    W = state[0]
+    for i in range(xs.shape[0]):
+        log_lr = (mu1 - mu0) * (xs[i] - 0.5 * (mu0 + mu1)) / sigma**2
+        W = max(0.0, W + log_lr)
+        stats[i] = W
+        detections[i] = W >= h
+        if detections[i]:
+            W = 0.0
+    state[0] = W
+    return stats, detections
+
+@jit(nopython=True, nogil=True)
+def shiryaev_kernel(xs, state, params):
+    """
+    Shiryaev's Bayesian procedure with a geometric(rho) prior on the change
+    time and initial probability pi0. Tracks the posterior odds
+    phi = p / (1 - p) and alarms when p >= p_alarm.
+    params = (mu0, mu1, sigma, rho, pi0, p_alarm), state = (phi,)
+    Returns the posterior probability of change as the statistic.
+    """
+    mu0, mu1, sigma = params[0], params[1], params[2]
+    rho, pi0, p_alarm = params[3], params[4], params[5]
+    phi_alarm = p_alarm / (1 - p_alarm)
+    phi_reset = pi0 / (1 - pi0)
+    stats = np.empty(xs.shape[0])
+    detections = np.empty(xs.shape[0], dtype=np.bool_)
+    phi = state[0]
+    for i in range(xs.shape[0]):
+        phi = (phi + rho) / (1 - rho) * likelihood_ratio(xs[i], mu0, mu1, sigma)
+        stats[i] = phi / (1 + phi)
+        detections[i] = phi >= phi_alarm
+        if detections[i]:
+            phi = phi_reset
+    state[0] = phi
+    return stats, detections
+
+@jit(nopython=True, nogil=True)
+def ewma_kernel(xs, state, params):
+    """
+    One-sided EWMA chart towards mu1 with asymptotic control limits.
+    params = (mu0, mu1, sigma, lam, L), state = (Z,)
+    """
+    mu0, mu1, sigma, lam, L = params[0], params[1], params[2], params[3], params[4]
+    direction = 1.0 if mu1 >= mu0 else -1.0
+    limit = L * sigma * np.sqrt(lam / (2 - lam))
+    stats = np.empty(xs.shape[0])
+    detections = np.empty(xs.shape[0], dtype=np.bool_)
+    Z = state[0]
+    for i in range(xs.shape[0]):
+        Z = lam * xs[i] + (1 - lam) * Z
+        stats[i] = Z
+        detections[i] = direction * (Z - mu0) >= limit
+        if detections[i]:
+            Z = mu0
+    state[0] = Z
+    return stats, detections
@@ -0,0 +1,245 @@
+"""
+Asynchronous observation sources for the Shiryaev-Roberts monitor.
+Sources push float64 chunks into a bounded asyncio queue and an
+IngestPipeline regroups them into micro-batches for the detector.
+A full queue makes TCP, file and replay producers wait; UDP cannot be
+slowed down, so it drops and counts instead.
+"""
+import os
+import asyncio
+import numpy as np
+from typing import Callable, Optional
+
+def parse_lines(data: bytes) -> np.ndarray:
+    """Parse whitespace/newline separated numbers into a float64 array"""
+    fields = data.split()
+    if not fields:
+        return np.empty(0)
+    return np.array(fields, dtype=np.float64)
+
+def split_complete(buffer: bytes):
+    """Split a byte buffer into complete lines and the trailing partial line"""
+    cut = buffer.rfind(b'\n') + 1
+    return buffer[:cut], buffer[cut:]
+
+class ObservationSource:
+    """Base class: produce() pushes float64 chunks into the queue until done"""
+    dropped = 0
+
+    async def produce(self, queue: asyncio.Queue) -> None:
+        raise NotImplementedError
+
+class SimulatedSource(ObservationSource):
+    """Normal observations with a mean shift at change_point"""
+    def __init__(self, mu0: float, mu1: float, sigma: float, change_point: int,
+                 rate: Optional[float] = None, chunk_size: int = 1000, t0: int = 0):
+        self.mu0 = mu0
+        self.mu1 = mu1
+        self.sigma = sigma
+        self.change_point = change_point
+        self.rate = rate or None
+        self.chunk_size = chunk_size
+        if self.rate:
+            # Keep chunks short enough that pacing stays smooth
+            self.chunk_size = min(chunk_size, max(1, int(self.rate * 0.01)))
+        self.t = t0
+
+    async def produce(self, queue: asyncio.Queue) -> None:
+        rng = np.random.default_rng()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        produced = 0
+        while True:
+            times = np.arange(self.t, self.t + self.chunk_size)
+            means = np.where(times < self.change_point, self.mu0, self.mu1)
+            await queue.put(rng.normal(means, self.sigma))
+            self.t += self.chunk_size
+            produced += self.chunk_size
+
+            delay = start + produced / self.rate - loop.time() if self.rate else 0
+            await asyncio.sleep(max(delay, 0))
+
+class FileTailSource(ObservationSource):
+    """Follow a text file of one number per line, like `tail -f`"""
+    def __init__(self, path: str, from_start: bool = False, poll_interval: float = 0.05):
+        self.path = path
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+
+    async def produce(self, queue: asyncio.Queue) -> None:
+        while not os.path.exists(self.path):
+            await asyncio.sleep(self.poll_interval)
+
+        with open(self.path, 'rb') as f:
+            if not self.from_start:
+                f.seek(0, os.SEEK_END)
+            partial = b''
+            while True:
+                data = f.read(1 << 20)
+                if not data:
+                    # Start again if the file was truncated or rotated in place
+                    if os.path.getsize(self.path) < f.tell():
+                        f.seek(0)
+                        partial = b''
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                complete, partial = split_complete(partial + data)
+                values = parse_lines(complete)
+                if len(values):
+                    await queue.put(values)
+
+class ReplaySource(ObservationSource):
+    """Replay a recorded .npy or text file, optionally paced to `rate` per second"""
+    def __init__(self, path: str, rate: Optional[float] = None, chunk_size: int = 4096,
+                 loop: bool = False):
+        self.path = path
+        self.rate = rate or None
+        self.chunk_size = chunk_size
+        self.loop = loop
+
+    def _load(self) -> np.ndarray:
+        if self.path.endswith('.npy'):
+            return np.load(self.path, mmap_mode='r')
+        return np.loadtxt(self.path, dtype=np.float64, ndmin=1)
+
+    async def produce(self, queue: asyncio.Queue) -> None:
+        values = self._load()
+        clock = asyncio.get_running_loop()
+        while True:
+            start = clock.time()
+            for i in range(0, len(values), self.chunk_size):
+                chunk = np.array(values[i:i + self.chunk_size], dtype=np.float64)
+                await queue.put(chunk)
+                if self.rate:
+                    delay = start + (i + len(chunk)) / self.rate - clock.time()
+                    await asyncio.sleep(max(delay, 0))
+            if not self.loop:
+                return
+
+class TCPSource(ObservationSource):
+    """Listen on a local TCP port for newline-delimited numbers from any client"""
+    def __init__(self, host: str = '127.0.0.1', port: int = 9999, read_size: int = 1 << 16):
+        self.host = host
+        self.port = port
+        self.read_size = read_size
+
+    async def produce(self, queue: asyncio.Queue) -> None:
+        async def handle(reader, writer):
+            partial = b''
+            try:
+                while data := await reader.read(self.read_size):
+                    complete, partial = split_complete(partial + data)
+                    values = parse_lines(complete)
+                    if len(values):
+                        # Not reading while the queue is full pushes back on the sender
+                        await queue.put(values)
+                values = parse_lines(partial)
+                if len(values):
+                    await queue.put(values)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+class UDPSource(ObservationSource):
+    """Listen on a local UDP port; each datagram holds one or more numbers"""
+    def __init__(self, host: str = '127.0.0.1', port: int = 9999):
+        self.host = host
+        self.port = port
+        self.dropped = 0
+
+    async def produce(self, queue: asyncio.Queue) -> None:
+        source = self
+
+        class Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                values = parse_lines(data)
+                if not len(values):
+                    return
+                try:
+                    queue.put_nowait(values)
+                except asyncio.QueueFull:
+                    source.dropped += len(values)
+
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            Protocol, local_addr=(self.host, self.port))
+        try:
+            await asyncio.Future()
+        finally:
+            transport.close()
+
+class IngestPipeline:
+    """
+    Run a source into a bounded queue and hand micro-batches to `sink`.
+    A batch is flushed once it holds max_batch observations or its oldest
+    observation has waited max_delay seconds.
+    """
+    def __init__(self, source: ObservationSource, sink: Callable[[np.ndarray], None],
+                 max_batch: int = 8192, max_delay: float = 0.01, queue_size: int = 256):
+        self.source = source
+        self.sink = sink
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.n_received = 0
+        self.n_batches = 0
+
+    @property
+    def n_dropped(self) -> int:
+        return self.source.dropped
+
+    def _flush(self, pending) -> None:
+        batch = pending[0] if len(pending) == 1 else np.concatenate(pending)
+        self.sink(batch)
+        self.n_received += len(batch)
+        self.n_batches += 1
+
+    async def _consume(self, queue: asyncio.Queue, done: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        pending, count, deadline = [], 0, None
+        while True:
+            if pending:
+                timeout = max(deadline - loop.time(), 0)
+            elif done.is_set() and queue.empty():
+                return
+            else:
+                timeout = self.max_delay
+            try:
+                chunk = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                chunk = None
+
+            if chunk is not None:
+                if not pending:
+                    deadline = loop.time() + self.max_delay
+                pending.append(chunk)
+                count += len(chunk)
+            if pending and (count >= self.max_batch or loop.time() >= deadline
+                            or (done.is_set() and queue.empty())):
+                self._flush(pending)
+                pending, count = [], 0
+
+    async def _produce(self, queue: asyncio.Queue, done: asyncio.Event) -> None:
+        await self.source.produce(queue)
+        done.set()
+
+    async def run(self) -> None:
+        """
+        Ingest until the source finishes or the task is cancelled. If either
+        the source or the sink raises, the other side is cancelled and the
+        first failure is re-raised.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        done = asyncio.Event()
+        tasks = [asyncio.create_task(self._produce(queue, done)),
+                 asyncio.create_task(self._consume(queue, done))]
+        try:
+            finished, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in finished:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
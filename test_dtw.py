@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from dtw import band, dtw
+
+WINDOWS = [0, 0.3, 0.5, 1, 2, 3, 7, 20, None]
+
+@pytest.mark.parametrize('n, m', [(60, 30), (30, 60), (21, 47), (3, 200), (5, 2), (40, 40), (1, 9)])
+def test_sakoe_chiba_band_rows_nonempty_and_nested(n, m):
+    previous = None
+    for window in WINDOWS:
+        lo, hi = band(n, m, window)
+        assert (hi > lo).all()
+        assert lo[0] == 0 and hi[-1] == m
+        assert (lo[1:] <= hi[:-1]).all()
+        if previous is not None:
+            assert (lo <= previous[0]).all() and (hi >= previous[1]).all()
+        previous = lo, hi
+
+def test_distance_never_increases_with_window():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n, m = rng.integers(2, 80, 2)
+        x, y = rng.normal(size=n), rng.normal(size=m)
+        distances = [dtw(x, y, window=window).distance for window in WINDOWS]
+        assert np.isfinite(distances[0])
+        assert all(b <= a + 1e-9 for a, b in zip(distances, distances[1:]))
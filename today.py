@@ -2,11 +2,10 @@ import streamlit as st
 import pandas as pd
 import datetime
 import time
-import pickle
 from datetime import datetime, time as dt_time
-import os
 import plotly.graph_objects as go
 import numpy as np
+from ratehub_store import VoteStore, STORAGE_COLUMNS
 
 st.set_page_config(page_title="RateHub 🍦")
 
@@ -25,38 +24,17 @@ BML_COL = "BML 👨‍🚀"
 J_COL = "Q Monkey 🐵"
 VB_COL = "Rich Vish 💂‍♂️"
 DISPLAY_COLUMNS = [BML_COL, J_COL, VB_COL]
-STORAGE_COLUMNS = ['BML', 'J', 'VB']
-RATINGS_FILE = 'ratings.pkl'
-
-def init_session_state():
-    if 'daily_votes' not in st.session_state:
-        st.session_state['daily_votes'] = {}
-    if 'historical_data' not in st.session_state:
-        st.session_state['historical_data'] = pd.DataFrame(columns=['Date'] + STORAGE_COLUMNS)
-        st.session_state['historical_data'].set_index('Date', inplace=True)
-
-def load_data():
-    try:
-        if os.path.exists(RATINGS_FILE):
-            with open(RATINGS_FILE, 'rb') as f:
-                data = pickle.load(f)
-                if not isinstance(data, pd.DataFrame):
-                    return pd.DataFrame(columns=['Date'] + STORAGE_COLUMNS).set_index('Date')
-                if 'Date' not in data.index.name:
-                    data.set_index('Date', inplace=True)
-                return data
-        return pd.DataFrame(columns=['Date'] + STORAGE_COLUMNS).set_index('Date')
-    except Exception:
-        return pd.DataFrame(columns=['Date'] + STORAGE_COLUMNS).set_index('Date')
-
-def save_data(df):
-    try:
-        with open(RATINGS_FILE, 'wb') as f:
-            pickle.dump(df, f)
-        return True
-    except Exception as e:
-        st.error(f"Error saving data: {e}")
-        return False
+HISTORY_PERIODS = {'Daily': 'day', 'Weekly': 'week', 'Monthly': 'month'}
+HISTORY_INDEX_NAMES = {'day': 'Date', 'week': 'Week of', 'month': 'Month'}
+HISTORY_PAGE_SIZE = 20
+REFRESH_INTERVAL = 1  # seconds between checks for new votes
+
+@st.cache_resource
+def get_store():
+    # One store per server process: migrates ratings.pkl on first start
+    store = VoteStore()
+    store.start_compaction()
+    return store
 
 def get_color(val):
     colors = {0: 'background-color: green',
@@ -65,20 +43,21 @@ def get_color(val):
     return colors.get(val, '')
 
 def calculate_daily_rating():
-    votes = st.session_state['daily_votes'].get(current_date, [])
-    if not votes:
-        return {'BML': 0, 'J': 0, 'VB': 0}
-    
-    ratings = {}
-    for person in ['BML', 'J', 'VB']:
-        person_votes = [vote[person] for vote in votes]
-        avg = sum(person_votes) / len(person_votes)
-        ratings[person] = min(2, max(0, round(avg)))
-    return ratings
-
-init_session_state()
+    # Running totals shared by every session, no per-vote work
+    return store.ratings(current_date)
+
 current_date = datetime.now().date().strftime('%Y-%m-%d')
-st.session_state['historical_data'] = load_data()
+store = get_store()
+version = st.session_state.seen_version = store.poll()
+
+# One tiny poller reruns the page when the store moves, the sections below
+# render once per run from caches keyed by version
+@st.fragment(run_every=REFRESH_INTERVAL)
+def watch_votes():
+    if store.poll() != st.session_state.seen_version:
+        st.rerun()
+
+watch_votes()
 
 st.markdown('<div class="section-header">Submit Your Vote</div>', unsafe_allow_html=True)
 st.write("Rate each person (0 = Green, 1 = Yellow, 2 = Red)")
@@ -92,49 +71,47 @@ with col3:
     vb_vote = st.selectbox(VB_COL, options=[0, 1, 2], key='vb_vote')
 
 if st.button('Submit Vote'):
-    if current_date not in st.session_state['daily_votes']:
-        st.session_state['daily_votes'][current_date] = []
-    
     vote = {'BML': bml_vote, 'J': j_vote, 'VB': vb_vote}
-    st.session_state['daily_votes'][current_date].append(vote)
-    
-    current_ratings = calculate_daily_rating()
-    st.session_state['historical_data'].loc[current_date] = [
-        current_ratings['BML'],
-        current_ratings['J'],
-        current_ratings['VB']
-    ]
-    
-    save_data(st.session_state['historical_data'])
-    st.success('Vote submitted successfully!')
-    st.rerun()
+    try:
+        store.add_vote(current_date, vote)
+    except Exception as e:
+        st.error(f"Error saving vote: {e}")
+    else:
+        st.success('Vote submitted successfully!')
+        st.rerun()
 
 st.markdown('<div class="section-header">Today\'s Current Ratings</div>', unsafe_allow_html=True)
-current_ratings = calculate_daily_rating()
-current_df = pd.DataFrame([{
-    BML_COL: current_ratings['BML'],
-    J_COL: current_ratings['J'],
-    VB_COL: current_ratings['VB']
-}])
 
-styled_current = current_df.style.applymap(get_color, subset=DISPLAY_COLUMNS)
-st.dataframe(styled_current)
+@st.cache_data(max_entries=4)
+def current_ratings_frame(version, date):
+    current_ratings = calculate_daily_rating()
+    current_df = pd.DataFrame([{
+        BML_COL: current_ratings['BML'],
+        J_COL: current_ratings['J'],
+        VB_COL: current_ratings['VB']
+    }])
+    return current_df
+
+def render_current_ratings():
+    # Cached frames are copied per session; the Styler is built per render
+    current_df = current_ratings_frame(version, current_date)
+    st.dataframe(current_df.style.map(get_color, subset=DISPLAY_COLUMNS))
+
+    n_votes_today = store.n_votes(current_date)
+    st.write(f"Total votes today: {n_votes_today}")
 
-daily_votes = st.session_state['daily_votes'].get(current_date, [])
-st.write(f"Total votes today: {len(daily_votes)}")
+    if not n_votes_today:
+        st.info("No votes submitted yet today")
 
-if not daily_votes:
-    st.info("No votes submitted yet today")
+render_current_ratings()
 
 st.markdown('<div class="section-header">Voting Trends (Last 10 Votes)</div>', unsafe_allow_html=True)
 
-if not st.session_state['historical_data'].empty:
-    df = st.session_state['historical_data'].copy()
-    df = df.sort_index(ascending=True)
-    if len(df) > 10:
-        start_idx = len(df) - 10
-        df = df.iloc[start_idx:]
-    
+@st.cache_data(max_entries=4)
+def trend_window(version):
+    return store.window(last=10)
+
+def trend_figure(df):
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
@@ -198,24 +175,34 @@ if not st.session_state['historical_data'].empty:
     
     fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='LightGray')
     fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='LightGray')
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-st.markdown('<div class="section-header">Rating History</div>', unsafe_allow_html=True)
+def render_trend():
+    df = trend_window(version)
+    if not df.empty:
+        st.plotly_chart(trend_figure(df), use_container_width=True)
 
-if not st.session_state['historical_data'].empty:
-    df_display = st.session_state['historical_data'].copy()
-    df_display.index.name = 'Date'
-    df_display = df_display.rename(columns=dict(zip(STORAGE_COLUMNS, DISPLAY_COLUMNS)))
-    styled_df = df_display.style.applymap(get_color, subset=DISPLAY_COLUMNS)
-    st.dataframe(styled_df)
-else:
-    st.write("No historical data available yet.")
+render_trend()
 
-st.markdown("""
-    <script>
-        setTimeout(function(){
-            window.location.reload();
-        }, 60000);
-    </script>
-    """, unsafe_allow_html=True)
+st.markdown('<div class="section-header">Rating History</div>', unsafe_allow_html=True)
+
+@st.cache_data(max_entries=32)
+def history_frame(version, period, page):
+    # Only the rows on this page are built and styled
+    df_display = store.page(page - 1, HISTORY_PAGE_SIZE, period)
+    df_display.index.name = HISTORY_INDEX_NAMES[period]
+    return df_display.rename(columns=dict(zip(STORAGE_COLUMNS, DISPLAY_COLUMNS)))
+
+def render_history():
+    period = st.radio('Group by', options=list(HISTORY_PERIODS), horizontal=True, key='history_period')
+    n_rows = store.aggregator.count(HISTORY_PERIODS[period])
+    if n_rows:
+        n_pages = -(-n_rows // HISTORY_PAGE_SIZE)
+        page = st.number_input(f'Page (of {n_pages})', min_value=1, max_value=n_pages, value=1,
+                               key='history_page')
+        df_display = history_frame(version, HISTORY_PERIODS[period], page)
+        st.dataframe(df_display.style.map(get_color, subset=DISPLAY_COLUMNS))
+    else:
+        st.write("No historical data available yet.")
+
+render_history()